@@ -0,0 +1,339 @@
+"""
+Combinatorics Table Store
+
+Precomputed Catalan numbers, A000081 rooted-tree counts, primes and small
+Pascal rows, bundled as one binary file and memory-mapped at import. Every
+lookup is a slice of the mapping, so short-lived processes get the values
+without recomputing them. Requests outside the stored ranges fall back to
+the computing functions in projective_geometry and systems_math.
+
+Regenerate the bundled file with:
+
+    python combinatorics_tables.py build
+    python combinatorics_tables.py check
+"""
+
+from array import array
+from typing import Dict, List, Optional, Tuple
+import argparse
+import bisect
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+
+# =============================================================================
+# FILE FORMAT
+# =============================================================================
+
+# Layout:
+#   magic (8 bytes) | header length (u32, little-endian) | JSON header
+#   | zero padding to 8 bytes | payload
+# The header maps each table name to its payload offset, byte length and
+# typecode, and records the SHA-256 of the whole payload. Integers are
+# little-endian; big values (Catalan, A000081) are stored as an offsets
+# table plus their concatenated minimal-length byte strings.
+
+TABLES_MAGIC = b"COSYTABL"
+TABLES_VERSION = 1
+TABLES_ALIGNMENT = 8
+
+DEFAULT_TABLES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                   "data", "combinatorics.tbl")
+
+# Ranges bundled by default (`build` can override each)
+DEFAULT_CATALAN_MAX = 512
+DEFAULT_ROOTED_TREES_MAX = 512
+DEFAULT_PRIME_LIMIT = 1 << 20
+DEFAULT_PASCAL_ROWS = 64     # rows 0..63 fit in unsigned 64-bit entries
+
+
+def _pack_big(values: List[int]) -> Tuple[bytes, bytes]:
+    """Offsets table and concatenated bytes of non-negative integers."""
+    offsets = array('Q', [0])
+    chunks = []
+    for v in values:
+        chunk = v.to_bytes((v.bit_length() + 7) // 8, "little")
+        chunks.append(chunk)
+        offsets.append(offsets[-1] + len(chunk))
+    return _le_bytes(offsets), b"".join(chunks)
+
+
+def _le_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+# =============================================================================
+# TABLE CONSTRUCTION
+# =============================================================================
+
+def _catalan_values(n_max: int) -> List[int]:
+    values = [1]
+    for n in range(n_max):
+        values.append(values[-1] * 2 * (2 * n + 1) // (n + 2))
+    return values
+
+
+def _rooted_tree_values(n_max: int) -> List[int]:
+    """a(0)..a(n_max) of A000081 by the Euler transform (a(0) = 0)."""
+    a = [0, 1]
+    s = [0, 1]    # s(k) = sum of d * a(d) over divisors d of k
+    for m in range(1, n_max):
+        a.append(sum(s[k] * a[m - k + 1] for k in range(1, m + 1)) // m)
+        k = m + 1
+        s.append(sum(d * a[d] for d in range(1, k + 1) if k % d == 0))
+    return a[:n_max + 1]
+
+
+def _prime_values(limit: int) -> Tuple[array, bytearray]:
+    """Primes <= limit and a bitmap over odd numbers (bit i <-> 2i + 1)."""
+    sieve = bytearray([1]) * (limit + 1)
+    sieve[0:2] = b"\x00\x00"
+    for p in range(2, math.isqrt(limit) + 1):
+        if sieve[p]:
+            sieve[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    primes = array('I', (p for p in range(limit + 1) if sieve[p]))
+    bits = bytearray((limit // 2 + 8) // 8)
+    for p in primes[1:]:
+        i = p >> 1
+        bits[i >> 3] |= 1 << (i & 7)
+    return primes, bits
+
+
+def _pascal_values(rows: int) -> array:
+    return array('Q', (math.comb(n, k) for n in range(rows) for k in range(n + 1)))
+
+
+def _table_payloads(catalan_max: int, rooted_trees_max: int,
+                    prime_limit: int, pascal_rows: int) -> Dict[str, Tuple[str, bytes]]:
+    catalan_offsets, catalan_data = _pack_big(_catalan_values(catalan_max))
+    tree_offsets, tree_data = _pack_big(_rooted_tree_values(rooted_trees_max))
+    primes, prime_bits = _prime_values(prime_limit)
+    return {
+        "catalan.offsets": ('Q', catalan_offsets),
+        "catalan.data": ('B', catalan_data),
+        "a000081.offsets": ('Q', tree_offsets),
+        "a000081.data": ('B', tree_data),
+        "primes": ('I', _le_bytes(primes)),
+        "prime_bits": ('B', bytes(prime_bits)),
+        "pascal": ('Q', _le_bytes(_pascal_values(pascal_rows))),
+    }
+
+
+def build_tables(path: str = DEFAULT_TABLES_PATH,
+                 catalan_max: int = DEFAULT_CATALAN_MAX,
+                 rooted_trees_max: int = DEFAULT_ROOTED_TREES_MAX,
+                 prime_limit: int = DEFAULT_PRIME_LIMIT,
+                 pascal_rows: int = DEFAULT_PASCAL_ROWS) -> None:
+    """Compute every table from scratch and atomically write the file."""
+    if pascal_rows > 68:
+        raise ValueError("Pascal rows beyond 67 overflow 64-bit entries")
+    payloads = _table_payloads(catalan_max, rooted_trees_max, prime_limit, pascal_rows)
+    tables = {}
+    payload = bytearray()
+    for name, (typecode, data) in payloads.items():
+        payload.extend(bytes(-len(payload) % TABLES_ALIGNMENT))
+        tables[name] = {"offset": len(payload), "length": len(data), "typecode": typecode}
+        payload.extend(data)
+    header = json.dumps({
+        "version": TABLES_VERSION,
+        "catalan_max": catalan_max,
+        "rooted_trees_max": rooted_trees_max,
+        "prime_limit": prime_limit,
+        "pascal_rows": pascal_rows,
+        "tables": tables,
+        "sha256": hashlib.sha256(payload).hexdigest(),
+    }, sort_keys=True).encode()
+    prefix = TABLES_MAGIC + struct.pack("<I", len(header)) + header
+    prefix += bytes(-len(prefix) % TABLES_ALIGNMENT)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix)
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+# =============================================================================
+# MEMORY-MAPPED TABLES
+# =============================================================================
+
+class CombinatoricsTables:
+    """
+    Read-only view of a table file.
+
+    The file is mapped once and its payload hashed against the header, so
+    a truncated or edited file is rejected with ValueError. Fixed-width
+    tables are exposed as memoryviews over the mapping; nothing is copied
+    until a value is returned.
+    """
+
+    def __init__(self, path: str = DEFAULT_TABLES_PATH, verify: bool = True):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        if view[:len(TABLES_MAGIC)] != TABLES_MAGIC:
+            raise ValueError(f"{path} is not a combinatorics table file")
+        start = len(TABLES_MAGIC) + 4
+        header_length, = struct.unpack_from("<I", view, len(TABLES_MAGIC))
+        header = json.loads(bytes(view[start:start + header_length]))
+        if header.get("version") != TABLES_VERSION:
+            raise ValueError(f"{path} has unsupported version {header.get('version')}")
+        start += header_length
+        self._payload = view[start + (-start % TABLES_ALIGNMENT):]
+        if verify and hashlib.sha256(self._payload).hexdigest() != header["sha256"]:
+            raise ValueError(f"{path} is corrupt (checksum mismatch)")
+        self.catalan_max = header["catalan_max"]
+        self.rooted_trees_max = header["rooted_trees_max"]
+        self.prime_limit = header["prime_limit"]
+        self.pascal_rows = header["pascal_rows"]
+        self._tables = {name: self._table(spec) for name, spec in header["tables"].items()}
+        self._primes = self._tables["primes"]
+        self._prime_bits = self._tables["prime_bits"]
+        self._pascal = self._tables["pascal"]
+
+    def _table(self, spec: dict):
+        data = self._payload[spec["offset"]:spec["offset"] + spec["length"]]
+        if len(data) != spec["length"]:
+            raise ValueError(f"{self.path} is truncated")
+        if spec["typecode"] == 'B':
+            return data
+        if sys.byteorder == "little":
+            return data.cast(spec["typecode"])
+        values = array(spec["typecode"], data)
+        values.byteswap()
+        return values
+
+    def __repr__(self) -> str:
+        return (f"CombinatoricsTables({self.path!r}, catalan_max={self.catalan_max}, "
+                f"rooted_trees_max={self.rooted_trees_max}, prime_limit={self.prime_limit}, "
+                f"pascal_rows={self.pascal_rows})")
+
+    def _big(self, name: str, n: int) -> int:
+        offsets = self._tables[f"{name}.offsets"]
+        return int.from_bytes(self._tables[f"{name}.data"][offsets[n]:offsets[n + 1]], "little")
+
+    def catalan(self, n: int) -> int:
+        """C(n) for 0 <= n <= catalan_max."""
+        if not 0 <= n <= self.catalan_max:
+            raise IndexError(f"Catalan index {n} outside the table")
+        return self._big("catalan", n)
+
+    def rooted_trees(self, n: int) -> int:
+        """a(n) of A000081 for 0 <= n <= rooted_trees_max (a(0) = 0)."""
+        if not 0 <= n <= self.rooted_trees_max:
+            raise IndexError(f"A000081 index {n} outside the table")
+        return self._big("a000081", n)
+
+    @property
+    def prime_count(self) -> int:
+        return len(self._primes)
+
+    def nth_prime(self, n: int) -> int:
+        """The nth prime (1-indexed) for n <= prime_count."""
+        if not 1 <= n <= len(self._primes):
+            raise IndexError(f"prime index {n} outside the table")
+        return self._primes[n - 1]
+
+    def is_prime(self, n: int) -> bool:
+        """Primality of 0 <= n <= prime_limit from the odd-number bitmap."""
+        if not 0 <= n <= self.prime_limit:
+            raise IndexError(f"{n} outside the prime table")
+        if n & 1 == 0:
+            return n == 2
+        i = n >> 1
+        return bool(self._prime_bits[i >> 3] >> (i & 7) & 1)
+
+    def prime_index(self, p: int) -> int:
+        """1-based index of p if it is a tabled prime, otherwise 0."""
+        if not self.is_prime(p):
+            return 0
+        return bisect.bisect_left(self._primes, p) + 1
+
+    def count_primes(self, x: int) -> int:
+        """Number of primes <= x for x <= prime_limit."""
+        if not x <= self.prime_limit:
+            raise IndexError(f"{x} outside the prime table")
+        return bisect.bisect_right(self._primes, x)
+
+    def pascal_row(self, n: int) -> Tuple[int, ...]:
+        """Row n of Pascal's triangle for n < pascal_rows."""
+        if not 0 <= n < self.pascal_rows:
+            raise IndexError(f"Pascal row {n} outside the table")
+        start = n * (n + 1) // 2
+        return tuple(self._pascal[start:start + n + 1])
+
+    def check(self) -> List[str]:
+        """Names of tables whose contents differ from a fresh computation."""
+        expected = _table_payloads(self.catalan_max, self.rooted_trees_max,
+                                   self.prime_limit, self.pascal_rows)
+        mismatched = []
+        for name, (_, data) in expected.items():
+            table = self._tables.get(name)
+            stored = _le_bytes(table) if isinstance(table, array) else bytes(table or b"")
+            if stored != data:
+                mismatched.append(name)
+        return mismatched
+
+
+def load_tables(path: Optional[str] = None) -> Optional[CombinatoricsTables]:
+    """
+    Map the table file, or return None when it is absent or fails its
+    integrity checks (callers then compute values as usual).
+
+    The path defaults to COSYSOC_TABLES, then the bundled data file.
+    """
+    path = path or os.environ.get("COSYSOC_TABLES") or DEFAULT_TABLES_PATH
+    try:
+        return CombinatoricsTables(path)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+TABLES = load_tables()
+
+
+# =============================================================================
+# COMMAND LINE
+# =============================================================================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Build or check the combinatorics table file")
+    parser.add_argument("command", choices=["build", "check", "info"])
+    parser.add_argument("--path", default=os.environ.get("COSYSOC_TABLES") or DEFAULT_TABLES_PATH)
+    parser.add_argument("--catalan-max", type=int, default=DEFAULT_CATALAN_MAX)
+    parser.add_argument("--rooted-trees-max", type=int, default=DEFAULT_ROOTED_TREES_MAX)
+    parser.add_argument("--prime-limit", type=int, default=DEFAULT_PRIME_LIMIT)
+    parser.add_argument("--pascal-rows", type=int, default=DEFAULT_PASCAL_ROWS)
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        build_tables(args.path, args.catalan_max, args.rooted_trees_max,
+                     args.prime_limit, args.pascal_rows)
+        print(f"Wrote {args.path} ({os.path.getsize(args.path)} bytes)")
+        return 0
+    try:
+        tables = CombinatoricsTables(args.path)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Invalid table file: {e}")
+        return 1
+    if args.command == "info":
+        print(tables)
+        return 0
+    mismatched = tables.check()
+    if mismatched:
+        print(f"Mismatched tables: {', '.join(mismatched)}")
+        return 1
+    print(f"{args.path}: checksum and contents OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,55 +9,425 @@ This module implements the mathematical formalization of Systems 0-5 using:
 - Nested tuple expressions (recursive structure encoding)
 """
 
-from dataclasses import dataclass, field
-from typing import List, Tuple, Dict, Set, Optional, Generator
-from functools import lru_cache
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict, deque
+from dataclasses import asdict, dataclass, field
+from typing import List, Tuple, Dict, Set, Optional, Generator, Iterable
+from functools import cached_property, lru_cache
+import bisect
+import hashlib
+import io
+import itertools
+import json
 import math
+import multiprocessing
+import os
+import pickle
+import random
+import struct
+import sys
+import tempfile
+import threading
+
+try:
+    from .combinatorics_tables import TABLES
+except ImportError:
+    from combinatorics_tables import TABLES
 
 
 # =============================================================================
 # MATULA NUMBERS - Prime factorization encoding of rooted trees
 # =============================================================================
 
+class PrimeSieve:
+    """
+    Incrementally growing segmented sieve shared by the prime helpers.
+
+    All primes up to ``limit`` are held in ascending order in a compact
+    ``array('q')``, so nth-prime lookups are O(1) and prime indices are a
+    bisect once the sieve covers the requested range. Growth is guarded by
+    a lock; readers only ever see fully sieved prefixes. The prime list can
+    be saved to and loaded from a binary cache file, whose header records
+    the prime count and a SHA-256 of the primes. An unreadable cache given
+    to the constructor is ignored and the sieve starts from scratch.
+
+    Memory grows with the sieved range (about 8 bytes per prime), so the
+    sieve refuses to grow past ``max_limit`` and raises OverflowError
+    instead. The default, 2^28, holds about 14.6 million primes (117 MB).
+    """
+
+    SEGMENT_SIZE = 1 << 18
+    CACHE_MAGIC = b"COSYPRIM"
+    MAX_LIMIT = 1 << 28
+
+    def __init__(self, initial_limit: int = 1024, cache_path: Optional[str] = None,
+                 max_limit: int = MAX_LIMIT):
+        self._lock = threading.RLock()
+        self.primes = array('q')
+        self.limit = 1
+        self.max_limit = max_limit
+        self.cache_path = cache_path
+        if cache_path and os.path.exists(cache_path):
+            try:
+                self.load(cache_path)
+            except (OSError, ValueError, struct.error):
+                pass
+        self.extend(min(initial_limit, max_limit))
+
+    def extend(self, limit: int) -> None:
+        """Sieve so that every prime <= limit is known"""
+        if limit <= self.limit:
+            return
+        if limit > self.max_limit:
+            raise OverflowError(
+                f"sieving to {limit} exceeds the prime sieve bound {self.max_limit}")
+        with self._lock:
+            self._extend(limit)
+
+    def _extend(self, limit: int) -> None:
+        if limit <= self.limit:
+            return
+        root = math.isqrt(limit)
+        if root > self.limit:
+            self._extend(root)
+        primes = self.primes
+        lo = max(self.limit + 1, 2)
+        while lo <= limit:
+            hi = min(lo + self.SEGMENT_SIZE - 1, limit)
+            segment = bytearray(b"\x01") * (hi - lo + 1)
+            for p in primes:
+                if p * p > hi:
+                    break
+                start = max(p * p, -(-lo // p) * p)
+                if start <= hi:
+                    segment[start - lo::p] = bytes((hi - start) // p + 1)
+            primes.extend(itertools.compress(range(lo, hi + 1), segment))
+            self.limit = hi
+            lo = hi + 1
+
+    def nth_prime(self, n: int) -> int:
+        """The nth prime (1-indexed)"""
+        # p_n > n (ln n + ln ln n - 1) for n >= 2: fail before sieving in vain
+        if n >= 2 and n * (math.log(n) + math.log(math.log(n)) - 1) > self.max_limit:
+            raise OverflowError(
+                f"prime number {n} lies beyond the prime sieve bound {self.max_limit}")
+        while len(self.primes) < n:
+            if self.limit >= self.max_limit:
+                raise OverflowError(
+                    f"prime number {n} lies beyond the prime sieve bound {self.max_limit}")
+            # p_n < n (ln n + ln ln n) for n >= 6
+            estimate = int(n * (math.log(n) + math.log(math.log(n)))) + 1 if n >= 6 else 13
+            self.extend(min(max(estimate, 2 * self.limit), self.max_limit))
+        return self.primes[n - 1]
+
+    def prime_index(self, p: int) -> int:
+        """1-based index of p among the primes, or 0 if p is not prime"""
+        self.extend(p)
+        i = bisect.bisect_left(self.primes, p)
+        if i < len(self.primes) and self.primes[i] == p:
+            return i + 1
+        return 0
+
+    def is_prime(self, n: int) -> bool:
+        """Primality by lookup; only valid for n <= limit"""
+        i = bisect.bisect_left(self.primes, n)
+        return i < len(self.primes) and self.primes[i] == n
+
+    def save(self, path: Optional[str] = None) -> None:
+        """Atomically write the sieved primes to a binary cache file"""
+        path = path or self.cache_path
+        if not path:
+            raise ValueError("No cache path given")
+        with self._lock:
+            data = self.primes.tobytes()
+            header = (self.CACHE_MAGIC + sys.byteorder[0].encode()
+                      + struct.pack("<QQ", self.limit, len(self.primes))
+                      + hashlib.sha256(data).digest())
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(header)
+                f.write(data)
+            os.replace(tmp_path, path)
+
+    def load(self, path: str) -> None:
+        """Adopt the primes stored in a cache file if it extends the sieve"""
+        with open(path, "rb") as f:
+            magic = f.read(len(self.CACHE_MAGIC))
+            byteorder = f.read(1).decode()
+            limit, count = struct.unpack("<QQ", f.read(16))
+            digest = f.read(32)
+            data = f.read()
+        if magic != self.CACHE_MAGIC:
+            raise ValueError(f"{path} is not a prime cache file")
+        if hashlib.sha256(data).digest() != digest:
+            raise ValueError(f"{path} is corrupt (checksum mismatch)")
+        primes = array('q')
+        primes.frombytes(data)
+        if byteorder != sys.byteorder[0]:
+            primes.byteswap()
+        if len(primes) != count or (primes and primes[-1] > limit):
+            raise ValueError(f"{path} is corrupt")
+        if primes[:10].tolist() != [2, 3, 5, 7, 11, 13, 17, 19, 23, 29][:len(primes)]:
+            raise ValueError(f"{path} is corrupt")
+        with self._lock:
+            if limit > self.limit:
+                self.primes = primes
+                self.limit = limit
+
+
+PRIME_SIEVE = PrimeSieve(cache_path=os.environ.get("COSYSOC_PRIME_CACHE"))
+
+
 def is_prime(n: int) -> bool:
     """Check if n is prime."""
     if n < 2:
         return False
-    if n == 2:
-        return True
+    if TABLES is not None and n <= TABLES.prime_limit:
+        return TABLES.is_prime(n)
+    if n <= PRIME_SIEVE.limit:
+        return PRIME_SIEVE.is_prime(n)
     if n % 2 == 0:
         return False
-    for i in range(3, int(math.sqrt(n)) + 1, 2):
+    for i in range(3, math.isqrt(n) + 1, 2):
         if n % i == 0:
             return False
     return True
 
 
 def nth_prime(n: int) -> int:
-    """Return the nth prime number (1-indexed: nth_prime(1) = 2)."""
+    """
+    Return the nth prime number (1-indexed: nth_prime(1) = 2).
+
+    Raises OverflowError when the prime lies beyond PRIME_SIEVE.max_limit.
+    """
     if n < 1:
         raise ValueError("n must be >= 1")
-    count = 0
-    num = 1
-    while count < n:
-        num += 1
-        if is_prime(num):
-            count += 1
-    return num
+    if TABLES is not None and n <= TABLES.prime_count:
+        return TABLES.nth_prime(n)
+    return PRIME_SIEVE.nth_prime(n)
+
+
+# prime_count sieves up to this bound; beyond it (and beyond what the
+# sieve already holds) it switches to the Lucy_Hedgehog count
+PRIME_COUNT_SIEVE_LIMIT = 1 << 24
+# Lucy needs about 40 * sqrt(x) bytes: roughly 170 MB at this bound
+PRIME_COUNT_MAX = 1 << 44
+
+
+@lru_cache(maxsize=256)
+def _lucy_prime_count(x: int) -> int:
+    """
+    pi(x) by the Lucy_Hedgehog method in O(x^(3/4)) time and O(sqrt x) memory.
+
+    small[v] and large[i] hold S(v) and S(x // i), the count of integers
+    in 2..v not yet struck out; striking the multiples of each prime p up
+    to sqrt x is one vectorized update per array. Fancy indexing copies
+    its operands first, so every update reads the previous round's values.
+    """
+    import numpy as np
+    r = math.isqrt(x)
+    small = np.arange(-1, r, dtype=np.int64)     # small[v] = v - 1
+    small[0] = 0
+    quotients = x // np.arange(1, r + 1, dtype=np.int64)
+    large = np.empty(r + 1, dtype=np.int64)
+    large[1:] = quotients - 1                      # large[i] = x // i - 1
+    PRIME_SIEVE.extend(r)
+    for k, p in enumerate(PRIME_SIEVE.primes):
+        p2 = p * p
+        if p2 > x:
+            break
+        # S(v) -= S(v // p) - S(p - 1) for every v >= p^2, with S(p - 1) = k
+        lim = min(r, x // p2)
+        direct = min(lim, r // p)      # x // (i * p) is still a large value
+        if direct:
+            large[1:direct + 1] -= large[p:p * direct + 1:p] - k
+        if lim > direct:
+            large[direct + 1:lim + 1] -= small[quotients[direct:lim] // p] - k
+        if p2 <= r:
+            small[p2:] -= small[np.arange(p2, r + 1) // p] - k
+    return int(large[1])
+
+
+def prime_count(x: int) -> int:
+    """
+    Number of primes <= x.
+
+    Answered from the bundled tables or the sieve where they reach, else
+    by _lucy_prime_count (about 0.1 s near 5e9 and a few seconds near
+    1e12). Raises OverflowError above PRIME_COUNT_MAX.
+    """
+    if x < 2:
+        return 0
+    if TABLES is not None and x <= TABLES.prime_limit:
+        return TABLES.count_primes(x)
+    if x <= PRIME_SIEVE.limit or x <= PRIME_COUNT_SIEVE_LIMIT:
+        PRIME_SIEVE.extend(x)
+        return bisect.bisect_right(PRIME_SIEVE.primes, x)
+    if x > PRIME_COUNT_MAX:
+        raise OverflowError(f"prime_count({x}) exceeds PRIME_COUNT_MAX = {PRIME_COUNT_MAX}")
+    return _lucy_prime_count(x)
 
 
 def prime_index(p: int) -> int:
-    """Return the index of prime p (1-indexed: prime_index(2) = 1)."""
-    if not is_prime(p):
+    """
+    Return the index of prime p (1-indexed: prime_index(2) = 1).
+
+    Primes past the sieve are indexed with prime_count, so large Matula
+    factors cost seconds rather than memory; OverflowError is raised only
+    above PRIME_COUNT_MAX.
+    """
+    if p < 2:
+        index = 0
+    elif TABLES is not None and p <= TABLES.prime_limit:
+        index = TABLES.prime_index(p)
+    elif p <= PRIME_SIEVE.limit or p <= PRIME_COUNT_SIEVE_LIMIT:
+        index = PRIME_SIEVE.prime_index(p)
+    else:
+        index = prime_count(p) if is_probable_prime(p) else 0
+    if not index:
         raise ValueError(f"{p} is not prime")
-    count = 0
-    for i in range(2, p + 1):
-        if is_prime(i):
-            count += 1
-    return count
+    return index
 
 
-def matula_to_tree(n: int) -> dict:
+class SmallestPrimeFactorTable:
+    """
+    Lazily extended smallest-prime-factor table.
+
+    ``spf[k]`` holds the smallest prime factor of each composite k <= limit
+    (0 for primes), so factoring any covered number is a walk of at most
+    log2(k) lookups. The table grows by doubling up to ``max_limit``.
+    """
+
+    def __init__(self, max_limit: int = 1 << 22):
+        self._lock = threading.Lock()
+        self.max_limit = max_limit
+        self.spf = array('I')
+        self.limit = 1
+
+    def extend(self, limit: int) -> None:
+        """Cover every k <= limit (capped at max_limit)"""
+        limit = min(max(limit, 2 * self.limit), self.max_limit)
+        if limit <= self.limit:
+            return
+        with self._lock:
+            if limit <= self.limit:
+                return
+            spf = array('I', bytes(4 * (limit + 1)))
+            PRIME_SIEVE.extend(math.isqrt(limit))
+            roots = itertools.takewhile(lambda p: p * p <= limit, PRIME_SIEVE.primes)
+            # Assign largest primes first so smaller factors overwrite them
+            for p in reversed(list(roots)):
+                spf[p * p::p] = array('I', [p]) * ((limit - p * p) // p + 1)
+            self.spf = spf
+            self.limit = limit
+
+    def factorize(self, n: int) -> List[int]:
+        """Prime factors of n <= limit in ascending order, with multiplicity"""
+        spf = self.spf
+        factors = []
+        while n > 1:
+            p = spf[n] or n
+            factors.append(p)
+            n //= p
+        return factors
+
+
+SPF_TABLE = SmallestPrimeFactorTable()
+
+# Deterministic Miller-Rabin witnesses for every n < 3.3 * 10**24
+_MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_probable_prime(n: int) -> bool:
+    """Miller-Rabin primality test (deterministic below 3.3 * 10**24)."""
+    if n < 2:
+        return False
+    for p in _MILLER_RABIN_BASES:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    r = 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+    for a in _MILLER_RABIN_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _pollard_brent(n: int) -> int:
+    """Return a non-trivial factor of the odd composite n (Brent's variant)."""
+    for c in itertools.count(1):
+        y, m, g, r, q = 2, 128, 1, 1, 1
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = math.gcd(q, n)
+                k += m
+            r *= 2
+        if g == n:
+            # Batched gcd overshot; backtrack one step at a time
+            g = 1
+            while g == 1:
+                ys = (ys * ys + c) % n
+                g = math.gcd(abs(x - ys), n)
+        if g != n:
+            return g
+    raise AssertionError("unreachable")
+
+
+def factorize(n: int) -> List[int]:
+    """
+    Prime factors of n in ascending order, with multiplicity.
+
+    Numbers within SPF_TABLE.max_limit are factored from the smallest-
+    prime-factor table; larger cofactors fall back to trial division by
+    small primes, Miller-Rabin and Pollard-Brent.
+    """
+    if n < 1:
+        raise ValueError("n must be >= 1")
+    if n <= SPF_TABLE.max_limit:
+        SPF_TABLE.extend(n)
+        return SPF_TABLE.factorize(n)
+
+    factors = []
+    for p in itertools.takewhile(lambda p: p < 1000, PRIME_SIEVE.primes):
+        while n % p == 0:
+            factors.append(p)
+            n //= p
+    pending = [n] if n > 1 else []
+    while pending:
+        m = pending.pop()
+        if m <= SPF_TABLE.max_limit:
+            SPF_TABLE.extend(m)
+            factors.extend(SPF_TABLE.factorize(m))
+        elif is_probable_prime(m):
+            factors.append(m)
+        else:
+            d = _pollard_brent(m)
+            pending.extend((d, m // d))
+    factors.sort()
+    return factors
+
+
+def matula_to_tree(n: int, compact: bool = False):
     """
     Convert Matula number to rooted tree representation.
     
@@ -67,62 +437,621 @@ def matula_to_tree(n: int) -> dict:
     - For composite n = p1^a1 * p2^a2 * ..., the root has children
       corresponding to matula_to_tree(index(p1)), matula_to_tree(index(p2)), etc.
     - For prime p, the tree has a root with one child: matula_to_tree(index(p))
+
+    With compact=True a CompactTree is returned instead of nested dicts.
     """
-    if n == 1:
-        return {"value": "empty", "children": []}
-    if n == 2:
-        return {"value": "leaf", "children": []}
-    
-    # Factor n
-    children = []
-    temp = n
-    p = 2
-    while temp > 1:
-        while temp % p == 0:
-            temp //= p
-            child_matula = prime_index(p)
-            children.append(matula_to_tree(child_matula))
-        p += 1
-    
-    return {"value": "node", "children": children}
+    tree = CompactTree.from_matula(n)
+    return tree if compact else tree.to_dict()
 
 
-def tree_to_matula(tree: dict) -> int:
+def tree_to_matula(tree) -> int:
     """Convert rooted tree representation to Matula number."""
-    if not tree["children"]:
-        if tree["value"] == "empty":
-            return 1
-        return 2  # leaf
-    
-    result = 1
-    for child in tree["children"]:
-        child_matula = tree_to_matula(child)
-        result *= nth_prime(child_matula)
-    return result
+    if isinstance(tree, CompactTree):
+        return tree.to_matula()
+    # Flatten in preorder; a reverse sweep then sees children before parents
+    nodes = []
+    parents = []
+    stack = [(tree, -1)]
+    while stack:
+        node, parent = stack.pop()
+        parents.append(parent)
+        nodes.append(node)
+        index = len(nodes) - 1
+        stack.extend((child, index) for child in node["children"])
 
+    matula = [1] * len(nodes)
+    for i in range(len(nodes) - 1, -1, -1):
+        node = nodes[i]
+        if not node["children"] and node["value"] != "empty":
+            matula[i] = 2  # leaf
+        if parents[i] >= 0:
+            matula[parents[i]] *= nth_prime(matula[i])
+    return matula[0]
 
-def tree_to_nested_parens(tree: dict) -> str:
+
+def tree_to_nested_parens(tree) -> str:
     """Convert tree to nested parentheses notation."""
-    if tree["value"] == "empty":
-        return ""
-    if not tree["children"]:
-        return "()"
-    
-    children_str = "".join(tree_to_nested_parens(c) for c in tree["children"])
-    return f"({children_str})"
+    if isinstance(tree, CompactTree):
+        return tree.to_nested_parens()
+    parts = []
+    stack = [tree]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, str):
+            parts.append(item)
+        elif item["value"] == "empty":
+            continue
+        elif not item["children"]:
+            parts.append("()")
+        else:
+            parts.append("(")
+            stack.append(")")
+            stack.extend(reversed(item["children"]))
+    return "".join(parts)
+
+
+# =============================================================================
+# ROOTED TREE ENUMERATION - Canonical level sequences
+# =============================================================================
+
+def _next_level_sequences(levels: List[int], fixed: int = 0) -> Generator[List[int], None, None]:
+    """
+    Beyer-Hedetniemi successor loop starting from a canonical sequence.
+
+    Yields ``levels`` itself after each in-place update and stops once the
+    next successor would change a position before ``fixed``.
+    """
+    n = len(levels)
+    while True:
+        yield levels
+        # p: last node deeper than the root's children
+        p = n - 1
+        while p > 0 and levels[p] <= 1:
+            p -= 1
+        if p < max(fixed, 1):
+            return
+        # q: p's parent; the tail is rebuilt by repeating the subtree at q
+        target = levels[p] - 1
+        q = p - 1
+        while levels[q] != target:
+            q -= 1
+        shift = p - q
+        for i in range(p, n):
+            levels[i] = levels[i - shift]
+
+
+def is_canonical_level_sequence(levels) -> bool:
+    """True if every node's subtrees appear in non-increasing order."""
+    n = len(levels)
+    # end[i]: one past the last node of i's subtree
+    end = [n] * n
+    stack = []
+    for i in range(n):
+        while stack and levels[stack[-1]] >= levels[i]:
+            end[stack.pop()] = i
+        stack.append(i)
+    for i in range(n):
+        prev = None
+        child = i + 1
+        while child < end[i]:
+            subtree = levels[child:end[child]]
+            if prev is not None and subtree > prev:
+                return False
+            prev = subtree
+            child = end[child]
+    return True
+
+
+def rooted_level_sequences_with_prefix(n: int, prefix) -> Generator[List[int], None, None]:
+    """
+    Generate the rooted trees with n nodes whose level sequence starts with prefix.
+
+    prefix must itself be a canonical level sequence (every prefix of a
+    canonical sequence is one). These trees form one contiguous block of
+    rooted_level_sequences(n); the block is generated in the same order,
+    starting from its lexicographically largest member.
+    """
+    levels = list(prefix)
+    if not levels or len(levels) > n or not is_canonical_level_sequence(levels):
+        return
+    for _ in range(len(levels), n):
+        for level in range(levels[-1] + 1, 0, -1):
+            levels.append(level)
+            if is_canonical_level_sequence(levels):
+                break
+            levels.pop()
+    yield from _next_level_sequences(levels, fixed=len(prefix))
+
+
+def rooted_level_sequences(n: int) -> Generator[List[int], None, None]:
+    """
+    Generate every unlabeled rooted tree with n nodes as a level sequence.
+
+    Each tree appears once in canonical form (preorder depths, with
+    subtrees in non-increasing order), from the path down to the star in
+    decreasing lexicographic order. Runs in constant amortized time per
+    tree by updating a single list in place: copy the yielded list if it
+    must outlive the next iteration.
+    """
+    if n < 1:
+        return
+    yield from _next_level_sequences(list(range(n)))
+
+
+# Matula numbers grow doubly exponentially with height: the largest for
+# 12 nodes is 50728129 (about 3 s of sieving to 7.9e7), while a 13-node
+# tree with that subtree needs the 50728129th prime, about 1e9, beyond
+# the default PRIME_SIEVE.max_limit. With max_limit raised to 2^30
+# (about 430 MB), level_sequence_to_matula handles every 13-node tree.
+MATULA_MAX_NODES = 12
+
+
+def _check_matula_nodes(n: int) -> None:
+    if n > MATULA_MAX_NODES:
+        raise OverflowError(
+            f"Matula numbers of {n}-node trees need primes beyond the prime sieve "
+            f"(at most {MATULA_MAX_NODES} nodes); use rooted_level_sequences instead")
+
+
+def level_sequence_to_matula(levels) -> int:
+    """
+    Matula number of the rooted tree given by a preorder level sequence.
+
+    Raises OverflowError when a prime beyond PRIME_SIEVE.max_limit is
+    needed (some trees with 13 or more nodes).
+    """
+    n = len(levels)
+    parent = [0] * n
+    last_at_level = [0] * (max(levels, default=0) + 1)
+    for i in range(1, n):
+        parent[i] = last_at_level[levels[i] - 1]
+        last_at_level[levels[i]] = i
+    # Descendants follow their ancestor in preorder, so a reverse sweep
+    # completes every subtree's product before it is folded into its parent
+    matula = [1] * n
+    for i in range(n - 1, 0, -1):
+        matula[parent[i]] *= nth_prime(matula[i])
+    return matula[0]
+
+
+def rooted_trees_with_matula(n: int) -> Generator[Tuple[Tuple[int, ...], int], None, None]:
+    """
+    Stream (level_sequence, matula_number) for every rooted tree with n nodes.
+
+    Raises OverflowError for n > MATULA_MAX_NODES;
+    rooted_level_sequences enumerates larger trees without Matula numbers.
+    """
+    _check_matula_nodes(n)
+    for levels in rooted_level_sequences(n):
+        yield tuple(levels), level_sequence_to_matula(levels)
+
+
+def system_matula_numbers(system_number: int) -> List[int]:
+    """
+    Matula numbers of System n: one per rooted tree with n + 1 nodes.
+
+    Listed from the star to the path (increasing level sequences).
+    """
+    numbers = [m for _, m in rooted_trees_with_matula(system_number + 1)]
+    numbers.reverse()
+    return numbers
+
+
+# =============================================================================
+# COMPACT TREES - Array-backed rooted trees
+# =============================================================================
+
+def _level_typecode(max_level: int) -> str:
+    """Smallest array typecode able to hold levels up to max_level."""
+    if max_level < 1 << 8:
+        return 'B'
+    if max_level < 1 << 16:
+        return 'H'
+    return 'l'
+
+
+class CompactTree:
+    """
+    Rooted tree stored as its preorder level sequence in an ``array``.
+
+    Node 0 is the root at level 0 and every node's children follow it in
+    preorder, so one small integer per node describes the whole tree (one
+    byte per node for depths below 256). Conversions to and from Matula
+    numbers, parentheses and the nested-dict format work on the array
+    directly without building per-node objects.
+    """
+
+    __slots__ = ("levels",)
+
+    def __init__(self, levels=(0,)):
+        if not isinstance(levels, (array, list, tuple)):
+            levels = list(levels)   # iterators would be consumed by max()
+        if not levels or levels[0] != 0:
+            raise ValueError("A level sequence must start with the root at level 0")
+        max_level = max(levels)
+        typecode = _level_typecode(max_level)
+        if isinstance(levels, array) and levels.typecode == typecode:
+            self.levels = levels
+        else:
+            self.levels = array(typecode, levels)
+
+    def __len__(self) -> int:
+        return len(self.levels)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CompactTree):
+            return NotImplemented
+        return self.levels == other.levels
+
+    def __hash__(self) -> int:
+        return hash(self.levels.tobytes())
+
+    def __repr__(self) -> str:
+        return f"CompactTree({self.levels.tolist()})"
+
+    def parents(self) -> array:
+        """Parent index of every node (-1 for the root)."""
+        levels = self.levels
+        parent = array('l', [-1]) * len(levels)
+        last_at_level = array('l', [0]) * (max(levels, default=0) + 1)
+        for i in range(1, len(levels)):
+            parent[i] = last_at_level[levels[i] - 1]
+            last_at_level[levels[i]] = i
+        return parent
+
+    # -- Matula numbers ------------------------------------------------------
+
+    @classmethod
+    def from_matula(cls, n: int) -> 'CompactTree':
+        """Tree with Matula number n (1 is the single-node tree)."""
+        if n < 1:
+            raise ValueError("n must be >= 1")
+        levels = []
+        stack = [(n, 0)]
+        while stack:
+            m, level = stack.pop()
+            levels.append(level)
+            if m > 1:
+                # Children in ascending prime order, as matula_to_tree lists them
+                stack.extend((prime_index(p), level + 1) for p in reversed(factorize(m)))
+        return cls(levels)
+
+    def to_matula(self) -> int:
+        """Matula number of this tree."""
+        return level_sequence_to_matula(self.levels)
+
+    # -- Parentheses ---------------------------------------------------------
+
+    @classmethod
+    def from_dyck(cls, parens: str) -> 'CompactTree':
+        """
+        Tree whose root's subtrees are the top-level groups of a Dyck word.
+
+        Same structure as partition_to_tree: n pairs give n + 1 nodes.
+        """
+        levels = [0]
+        depth = 0
+        for ch in parens:
+            if ch == '(':
+                depth += 1
+                levels.append(depth)
+            elif ch == ')':
+                if depth == 0:
+                    break  # Unmatched ')' closes the implicit outer group
+                depth -= 1
+        return cls(levels)
+
+    def to_dyck(self) -> str:
+        """Dyck word of the root's subtrees (inverse of from_dyck)."""
+        parts = []
+        prev = 0
+        for level in self.levels[1:]:
+            parts.append(')' * (prev - level + 1))
+            parts.append('(')
+            prev = level
+        parts.append(')' * prev)
+        return "".join(parts)
+
+    def to_nested_parens(self) -> str:
+        """Nested parentheses in the tree_to_nested_parens convention."""
+        levels = self.levels
+        n = len(levels)
+        parts = []
+        open_levels = []
+        for i in range(n):
+            level = levels[i]
+            while open_levels and open_levels[-1] >= level:
+                open_levels.pop()
+                parts.append(')')
+            # Leaves contribute nothing; internal nodes wrap their children
+            if i + 1 < n and levels[i + 1] > level:
+                parts.append('(')
+                open_levels.append(level)
+        parts.append(')' * len(open_levels))
+        return "".join(parts)
+
+    # -- Nested dict adapters ------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, tree: dict) -> 'CompactTree':
+        """
+        Convert a nested-dict tree from matula_to_tree or partition_to_tree.
+
+        A matula_to_tree ``"leaf"`` (Matula 2) is a node with one childless
+        child, matching tree_to_matula.
+        """
+        levels = []
+        stack = [(tree, 0)]
+        while stack:
+            node, level = stack.pop()
+            levels.append(level)
+            children = node["children"]
+            if not children and node.get("value") == "leaf":
+                levels.append(level + 1)
+            stack.extend((child, level + 1) for child in reversed(children))
+        return cls(levels)
+
+    def to_dict(self) -> dict:
+        """Convert to the nested-dict format produced by matula_to_tree."""
+        levels = self.levels
+        parent = self.parents()
+        children: List[List[dict]] = [[] for _ in range(len(levels))]
+        # Reverse preorder builds every child before its parent
+        for i in range(len(levels) - 1, -1, -1):
+            kids = children[i]
+            kids.reverse()
+            if not kids:
+                node = {"value": "empty", "children": []}
+            elif len(kids) == 1 and kids[0]["value"] == "empty":
+                node = {"value": "leaf", "children": []}
+            else:
+                node = {"value": "node", "children": kids}
+            if i == 0:
+                return node
+            children[parent[i]].append(node)
+
+
+# =============================================================================
+# CANONICAL TREE HASHING - AHU labels and dedup index
+# =============================================================================
+
+class TreeHasher:
+    """
+    AHU canonical labelling of rooted trees.
+
+    Every distinct subtree shape seen by this hasher gets a small integer
+    label, interned from the sorted labels of its children. Two trees are
+    isomorphic exactly when their root labels are equal, and labelling is
+    a single bottom-up pass (plus sorting each node's child labels).
+    Labels are only comparable between trees seen by the same hasher.
+    """
+
+    def __init__(self):
+        self._labels: Dict[Tuple[int, ...], int] = {(): 0}
+
+    def __len__(self) -> int:
+        """Number of distinct subtree shapes seen so far."""
+        return len(self._labels)
+
+    def canonical_id(self, tree) -> int:
+        """Canonical label of a CompactTree or nested-dict tree."""
+        if not isinstance(tree, CompactTree):
+            tree = CompactTree.from_dict(tree)
+        levels = tree.levels
+        parent = tree.parents()
+        labels = self._labels
+        children: List[Optional[List[int]]] = [None] * len(levels)
+        label = 0
+        # Reverse preorder labels every child before its parent
+        for i in range(len(levels) - 1, -1, -1):
+            kids = children[i]
+            if kids is None:
+                label = 0
+            else:
+                kids.sort()
+                key = tuple(kids)
+                label = labels.get(key)
+                if label is None:
+                    label = labels[key] = len(labels)
+            if i:
+                siblings = children[parent[i]]
+                if siblings is None:
+                    children[parent[i]] = [label]
+                else:
+                    siblings.append(label)
+        return label
+
+
+def trees_isomorphic(a, b) -> bool:
+    """True if two trees (CompactTree or nested dicts) are isomorphic."""
+    hasher = TreeHasher()
+    return hasher.canonical_id(a) == hasher.canonical_id(b)
+
+
+class TreeIndex:
+    """
+    Hash index from canonical tree form to (tree_id, matula_number).
+
+    Tree ids are assigned in insertion order to each new isomorphism
+    class. Matula numbers are stored when supplied, or computed for new
+    trees when compute_matula=True (they grow very quickly with depth).
+    """
+
+    def __init__(self, compute_matula: bool = False):
+        self.hasher = TreeHasher()
+        self.compute_matula = compute_matula
+        self._entries: Dict[int, Tuple[int, Optional[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, tree) -> bool:
+        return self.hasher.canonical_id(tree) in self._entries
+
+    def lookup(self, tree) -> Optional[Tuple[int, Optional[int]]]:
+        """(tree_id, matula_number) of an isomorphic tree already indexed, or None."""
+        return self._entries.get(self.hasher.canonical_id(tree))
+
+    def insert(self, tree, matula: Optional[int] = None) -> Tuple[int, bool]:
+        """Index a tree; returns (tree_id, is_new)."""
+        if not isinstance(tree, CompactTree):
+            tree = CompactTree.from_dict(tree)
+        key = self.hasher.canonical_id(tree)
+        entry = self._entries.get(key)
+        if entry is not None:
+            return entry[0], False
+        if matula is None and self.compute_matula:
+            matula = tree.to_matula()
+        tree_id = len(self._entries)
+        self._entries[key] = (tree_id, matula)
+        return tree_id, True
+
+    def insert_many(self, trees) -> Generator[Tuple[int, bool], None, None]:
+        """Stream insert results for an iterable of trees."""
+        for tree in trees:
+            yield self.insert(tree)
+
+    def dedup(self, trees) -> Generator:
+        """Yield each tree whose isomorphism class has not been seen before."""
+        for tree in trees:
+            if self.insert(tree)[1]:
+                yield tree
 
 
 # =============================================================================
 # PASCAL'S TRIANGLE AND SIMPLEX ELEMENTS
 # =============================================================================
 
-@lru_cache(maxsize=100)
+class PascalTriangle:
+    """
+    Pascal's triangle rows computed directly from the multiplicative formula.
+
+    Any row is built in O(n) big-integer steps without its predecessors.
+    Exact rows are kept in an LRU cache bounded by an approximate memory
+    budget (max_bytes) rather than an entry count, so many small rows or a
+    few large ones fit. Single entries, modular rows and float rows never
+    touch the cache.
+    """
+
+    def __init__(self, max_bytes: int = 64 << 20):
+        self.max_bytes = max_bytes
+        self._rows: "OrderedDict[int, Tuple[int, ...]]" = OrderedDict()
+        self._sizes: Dict[int, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _check(n: int) -> None:
+        if n < 0:
+            raise ValueError("n must be >= 0")
+
+    def row(self, n: int) -> Tuple[int, ...]:
+        """Row n (0-indexed) as exact integers."""
+        self._check(n)
+        with self._lock:
+            cached = self._rows.get(n)
+            if cached is not None:
+                self._rows.move_to_end(n)
+                return cached
+        if TABLES is not None and n < TABLES.pascal_rows:
+            row = TABLES.pascal_row(n)
+            self._store(n, row)
+            return row
+        values = [1] * (n + 1)
+        c = 1
+        for k in range(n // 2):
+            c = c * (n - k) // (k + 1)
+            values[k + 1] = values[n - k - 1] = c
+        row = tuple(values)
+        self._store(n, row)
+        return row
+
+    def _store(self, n: int, row: Tuple[int, ...]) -> None:
+        size = sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row[:len(row) // 2 + 1]) * 2
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if n in self._rows:
+                return
+            self._rows[n] = row
+            self._sizes[n] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                evicted, _ = self._rows.popitem(last=False)
+                self._bytes -= self._sizes.pop(evicted)
+
+    def entry(self, n: int, k: int) -> int:
+        """C(n, k) without building the row (0 outside the triangle)."""
+        self._check(n)
+        return math.comb(n, k) if 0 <= k <= n else 0
+
+    def row_mod(self, n: int, m: int) -> Tuple[int, ...]:
+        """
+        Row n reduced modulo m.
+
+        Prime moduli never form the exact row: the multiplicative formula
+        with modular inverses is used when m > n, Lucas' theorem otherwise.
+        """
+        self._check(n)
+        if m < 1:
+            raise ValueError("m must be >= 1")
+        if m == 1:
+            return (0,) * (n + 1)
+        if not is_probable_prime(m):
+            return tuple(v % m for v in self.row(n))
+        if m > n:
+            values = [1] * (n + 1)
+            c = 1
+            for k in range(n):
+                c = c * (n - k) % m * pow(k + 1, -1, m) % m
+                values[k + 1] = c
+            return tuple(values)
+        # Lucas: C(n, k) = prod C(n_i, k_i) mod p over the base-p digits
+        digits = []
+        rest = n
+        while rest:
+            rest, d = divmod(rest, m)
+            digits.append(d)
+        small = {d: self.row_mod(d, m) for d in set(digits)}
+        values = []
+        for k in range(n + 1):
+            c = 1
+            rest = k
+            for d in digits:
+                rest, kd = divmod(rest, m)
+                if kd > d:
+                    c = 0
+                    break
+                c = c * small[d][kd] % m
+            values.append(c)
+        return tuple(values)
+
+    def row_float(self, n: int) -> Tuple[float, ...]:
+        """
+        Row n as floats (inf where an entry exceeds the float range).
+        """
+        self._check(n)
+        values = [1.0] * (n + 1)
+        c = 1.0
+        for k in range(n // 2):
+            c = c * (n - k) / (k + 1)
+            values[k + 1] = values[n - k - 1] = c
+        return tuple(values)
+
+    def clear(self) -> None:
+        """Drop every cached row."""
+        with self._lock:
+            self._rows.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+
+PASCAL = PascalTriangle()
+
+
 def pascal_row(n: int) -> Tuple[int, ...]:
     """Return the nth row of Pascal's triangle (0-indexed)."""
-    if n == 0:
-        return (1,)
-    prev = pascal_row(n - 1)
-    return tuple([1] + [prev[i] + prev[i+1] for i in range(len(prev)-1)] + [1])
+    return PASCAL.row(n)
 
 
 def simplex_elements(dim: int) -> Dict[str, int]:
@@ -150,55 +1079,923 @@ def simplex_elements(dim: int) -> Dict[str, int]:
     return elements
 
 
+class SimplexLattice:
+    """
+    Face lattice of a dim-simplex with faces encoded as vertex bitmasks.
+
+    A k-face is the set of its k+1 vertices, stored as an int with bit i
+    set for vertex i. Containment is a mask test, faces of one dimension
+    are streamed with Gosper's hack, and counts come from binomials, so
+    nothing is materialized beyond the faces actually requested.
+    """
+
+    def __init__(self, dim: int):
+        if dim < 0:
+            raise ValueError("dim must be >= 0")
+        self.dim = dim
+        self.n_vertices = dim + 1
+        self.full = (1 << self.n_vertices) - 1
+
+    def __repr__(self) -> str:
+        return f"SimplexLattice(dim={self.dim})"
+
+    # -- encoding -------------------------------------------------------------
+
+    @staticmethod
+    def face_dim(face: int) -> int:
+        """Dimension of a face mask (-1 for the empty face)."""
+        return bin(face).count("1") - 1
+
+    @staticmethod
+    def to_tuple(face: int) -> Tuple[int, ...]:
+        """Vertex indices of a face mask, ascending."""
+        vertices = []
+        while face:
+            low = face & -face
+            vertices.append(low.bit_length() - 1)
+            face ^= low
+        return tuple(vertices)
+
+    def to_mask(self, vertices: Iterable[int]) -> int:
+        """Face mask of a collection of vertex indices."""
+        face = 0
+        for v in vertices:
+            if not 0 <= v < self.n_vertices:
+                raise ValueError(f"vertex {v} outside the {self.dim}-simplex")
+            face |= 1 << v
+        return face
+
+    # -- counting -------------------------------------------------------------
+
+    def f_vector(self):
+        """
+        Face counts f_0..f_dim as a numpy array (object dtype past int64).
+        """
+        import numpy as np
+        counts = pascal_row(self.n_vertices)[1:]
+        if self.n_vertices < 63:
+            return np.array(counts, dtype=np.int64)
+        return np.array(counts, dtype=object)
+
+    def face_count(self, k: int) -> int:
+        """Number of k-faces, C(dim+1, k+1)."""
+        return math.comb(self.n_vertices, k + 1) if -1 <= k <= self.dim else 0
+
+    def coface_count(self, face: int, k: int) -> int:
+        """Number of k-faces containing face, C(dim+1-|F|, k+1-|F|)."""
+        size = bin(face).count("1")
+        free = self.n_vertices - size
+        extra = k + 1 - size
+        return math.comb(free, extra) if 0 <= extra <= free else 0
+
+    # -- streaming ------------------------------------------------------------
+
+    def faces(self, k: int, as_tuples: bool = False) -> Generator:
+        """
+        Stream the k-faces in colexicographic order (Gosper's hack).
+        """
+        if not -1 <= k <= self.dim:
+            return
+        face = (1 << (k + 1)) - 1
+        limit = 1 << self.n_vertices
+        while face < limit:
+            yield self.to_tuple(face) if as_tuples else face
+            if face == 0:
+                return
+            low = face & -face
+            ripple = face + low
+            face = ripple | (((face ^ ripple) >> 2) // low)
+
+    def cofaces(self, face: int, k: Optional[int] = None,
+                as_tuples: bool = False) -> Generator:
+        """
+        Stream the faces containing face, or only those of dimension k.
+
+        Supersets are face | s for s a submask of the complement; with k
+        given, the added vertices are drawn by Gosper's hack over the free
+        positions and deposited into the complement.
+        """
+        free_mask = self.full & ~face
+        if k is None:
+            sub = 0
+            while True:
+                found = face | sub
+                yield self.to_tuple(found) if as_tuples else found
+                if sub == free_mask:
+                    return
+                sub = (sub - free_mask) & free_mask
+        free_bits = [1 << v for v in self.to_tuple(free_mask)]
+        extra = k + 1 - bin(face).count("1")
+        if not 0 <= extra <= len(free_bits):
+            return
+        for pick in SimplexLattice(len(free_bits) - 1).faces(extra - 1) if free_bits else (0,):
+            found = face
+            while pick:
+                low = pick & -pick
+                found |= free_bits[low.bit_length() - 1]
+                pick ^= low
+            yield self.to_tuple(found) if as_tuples else found
+
+    @staticmethod
+    def facets(face: int) -> Generator:
+        """Stream the codimension-1 faces of face (drop one vertex each)."""
+        rest = face
+        while rest:
+            low = rest & -rest
+            yield face ^ low
+            rest ^= low
+
+    @staticmethod
+    def contains(face: int, sub: int) -> bool:
+        """True when sub is a face of face."""
+        return face & sub == sub
+
+    # -- ranking --------------------------------------------------------------
+
+    @staticmethod
+    def rank(face: int) -> int:
+        """
+        Colex rank of a face among faces of its dimension (the position
+        at which faces() yields it), via the combinatorial number system.
+        """
+        r = 0
+        i = 1
+        while face:
+            low = face & -face
+            r += math.comb(low.bit_length() - 1, i)
+            face ^= low
+            i += 1
+        return r
+
+    def unrank(self, k: int, r: int, as_tuples: bool = False):
+        """Inverse of rank for k-faces."""
+        if not 0 <= r < self.face_count(k):
+            raise IndexError("rank out of range")
+        face = 0
+        v = self.n_vertices
+        for i in range(k + 1, 0, -1):
+            v -= 1
+            while math.comb(v, i) > r:
+                v -= 1
+            face |= 1 << v
+            r -= math.comb(v, i)
+        return self.to_tuple(face) if as_tuples else face
+
+
 # =============================================================================
 # TOPOLOGICAL SURFACES - Nested parentheses partitions
 # =============================================================================
 
+# Dyck words as integers: a 2n-bit mask read from the most significant bit,
+# with 1 for ')' and 0 for '('. Numeric order is then lexicographic order
+# with '(' < ')', the order generate_partitions has always produced.
+_TO_PARENS = str.maketrans("01", "()")
+_FROM_PARENS = str.maketrans("()", "01")
+
+
+def dyck_to_int(word: str) -> int:
+    """Encode a Dyck word as its bitmask."""
+    return int(word.translate(_FROM_PARENS), 2) if word else 0
+
+
+def int_to_dyck(mask: int, n: int) -> str:
+    """Decode the bitmask of a Dyck word with n pairs."""
+    return format(mask, f"0{2 * n}b").translate(_TO_PARENS) if n else ""
+
+
+def dyck_words(n: int, as_int: bool = False, start: int = 0,
+               stop: Optional[int] = None) -> Generator:
+    """
+    Loopless generator of all Dyck words with n pairs, in lexicographic order.
+
+    Each successor is a fixed number of integer operations on the bitmask.
+    The word has the form Q (^a )^b ()^k, with the run )^b at least two
+    long. The successor flips the last '(' of the (^a run and rewrites the
+    tail as Q (^(a-1) ) (^(k+1) )^(b+k-1). Yields bitmasks when as_int is
+    true, otherwise strings. start and stop restrict the output to the
+    words ranked start .. stop - 1.
+    """
+    if n < 0:
+        return
+    width = 2 * n
+    alternating = int("01" * n, 2) if n else 0
+    total = catalan_number(n)
+    stop = total if stop is None else min(stop, total)
+    if start >= stop:
+        return
+    w = dyck_unrank(n, start, as_int=True) if start else (1 << n) - 1  # ((( ... )))
+    for _ in range(stop - start - 1):
+        yield w if as_int else int_to_dyck(w, n)
+        diff = w ^ alternating
+        # Trailing ()^k pairs end where w first departs from 0101...01
+        tz = (diff & -diff).bit_length() - 1
+        k = tz >> 1
+        u = w >> (2 * k)
+        b = ((~u) & (u + 1)).bit_length() - 1   # length of the )^b run
+        v = u >> b
+        a = (v & -v).bit_length() - 1 if v else width - 2 * k - b
+        tail = a + b + 2 * k
+        w = ((w >> tail) << tail) | (1 << (b + 2 * k)) | ((1 << (b + k - 1)) - 1)
+    yield w if as_int else int_to_dyck(w, n)
+
+
+# Completions of a Dyck word prefix have the closed form of a ballot number:
+# a path of r steps from height h down to 0 that never dips below 0 can be
+# chosen in (h + 1) / (r + 1) * C(r + 1, (r - h) / 2) ways. Walking a word
+# left to right, the count needed after placing '(' at each position is
+# B(r, h + 1) with r the characters left; its binomial C(r + 1, k) moves to
+# C(r, k) after ')' and C(r, k - 1) after '(', one exact multiply and
+# divide per position, so rank and unrank need no table.
+
+def _dyck_word_mask(word, n: Optional[int]) -> Tuple[int, int]:
+    """(mask, n) of a Dyck word given as a string or a bitmask."""
+    if isinstance(word, str):
+        if len(word) % 2:
+            raise ValueError("Not a Dyck word: odd length")
+        return dyck_to_int(word), len(word) // 2
+    if n is None:
+        raise ValueError("n is required for bitmask words")
+    if n < 0 or not 0 <= word < 1 << 2 * n:
+        raise ValueError(f"Not a Dyck word bitmask for n = {n}")
+    return word, n
+
+
+def dyck_rank(word, n: Optional[int] = None) -> int:
+    """
+    Position of a Dyck word in generate_partitions(n) order (0-based).
+
+    word may be a string or a bitmask; bitmasks need n.
+    """
+    mask, n = _dyck_word_mask(word, n)
+    width = 2 * n
+    binom = math.comb(width, n - 1) if n else 0    # C(r + 1, k) at position 0
+    k = n - 1
+    rank = 0
+    height = 0
+    for pos in range(width):
+        remaining = width - pos - 1
+        if (mask >> remaining) & 1:
+            # Every word with '(' here comes first
+            rank += (height + 2) * binom // (remaining + 1)
+            binom = binom * (remaining + 1 - k) // (remaining + 1)
+            height -= 1
+            if height < 0:
+                raise ValueError("Not a Dyck word")
+        else:
+            binom = binom * k // (remaining + 1)
+            k -= 1
+            height += 1
+    if height:
+        raise ValueError("Not a Dyck word")
+    return rank
+
+
+def dyck_unrank(n: int, i: int, as_int: bool = False):
+    """The i-th Dyck word (0-based) of generate_partitions(n)."""
+    if not 0 <= i < catalan_number(n):
+        raise IndexError(f"rank {i} out of range for n = {n}")
+    width = 2 * n
+    binom = math.comb(width, n - 1) if n else 0
+    k = n - 1
+    mask = 0
+    height = 0
+    for pos in range(width):
+        remaining = width - pos - 1
+        opens = (height + 2) * binom // (remaining + 1)
+        if i < opens:
+            binom = binom * k // (remaining + 1)
+            k -= 1
+            height += 1
+        else:
+            i -= opens
+            mask |= 1 << remaining
+            binom = binom * (remaining + 1 - k) // (remaining + 1)
+            height -= 1
+    return mask if as_int else int_to_dyck(mask, n)
+
+
 def generate_partitions(n: int) -> Generator[str, None, None]:
     """
     Generate all valid nested parentheses (Dyck words) for n pairs.
     These represent the topological surfaces / partitions.
     """
-    def backtrack(s: str, open_count: int, close_count: int):
-        if len(s) == 2 * n:
-            yield s
-            return
-        if open_count < n:
-            yield from backtrack(s + "(", open_count + 1, close_count)
-        if close_count < open_count:
-            yield from backtrack(s + ")", open_count, close_count + 1)
-    
-    yield from backtrack("", 0, 0)
+    yield from dyck_words(n)
 
 
 def catalan_number(n: int) -> int:
     """Return the nth Catalan number."""
+    if TABLES is not None and 0 <= n <= TABLES.catalan_max:
+        return TABLES.catalan(n)
     return math.comb(2 * n, n) // (n + 1)
 
 
-def partition_to_tree(parens: str) -> dict:
-    """Convert nested parentheses to tree structure."""
-    def parse(s: str, idx: int) -> Tuple[dict, int]:
-        children = []
-        i = idx
-        while i < len(s):
-            if s[i] == '(':
-                child, i = parse(s, i + 1)
-                children.append(child)
-            elif s[i] == ')':
-                return {"children": children}, i + 1
-            else:
-                i += 1
-        return {"children": children}, i
-    
-    if not parens:
-        return {"children": []}
-    
-    # Wrap in outer parens for consistent parsing
-    result, _ = parse("(" + parens + ")", 1)
+def partition_to_tree(parens: str, compact: bool = False):
+    """
+    Convert nested parentheses to tree structure.
+
+    With compact=True a CompactTree is returned instead of nested dicts.
+    """
+    if compact:
+        return CompactTree.from_dyck(parens)
+    root = {"children": []}
+    stack = [root]
+    for ch in parens:
+        if ch == '(':
+            child = {"children": []}
+            stack[-1]["children"].append(child)
+            stack.append(child)
+        elif ch == ')':
+            if len(stack) == 1:
+                break  # Unmatched ')' closes the implicit outer group
+            stack.pop()
+    return root
+
+
+# =============================================================================
+# PARALLEL ENUMERATION - Sharded partitions and trees
+# =============================================================================
+
+# Enumeration kinds:
+#   "partitions" - Dyck words of n pairs, sharded by rank range
+#   "trees"      - level sequences of rooted trees with n nodes, sharded by prefix
+#   "matula"     - (level_sequence, matula_number) pairs, sharded like "trees"
+#                  (n <= MATULA_MAX_NODES)
+ENUMERATION_KINDS = ("partitions", "trees", "matula")
+
+
+def enumeration_shards(kind: str, n: int, shards: int = 64) -> list:
+    """
+    Split an enumeration into roughly ``shards`` independent pieces.
+
+    Partition shards are (start, stop) rank ranges. Tree shards are the
+    canonical prefixes of the shortest length giving at least ``shards``
+    pieces. Concatenating the shards in order reproduces the serial order.
+    """
+    if kind == "partitions":
+        total = catalan_number(n)
+        shards = max(1, min(shards, total))
+        bounds = [total * i // shards for i in range(shards + 1)]
+        return [(lo, hi) for lo, hi in zip(bounds, bounds[1:]) if lo < hi]
+    if kind in ("trees", "matula"):
+        if kind == "matula":
+            _check_matula_nodes(n)
+        if n < 1:
+            return []
+        for size in range(1, n + 1):
+            prefixes = [tuple(levels) for levels in rooted_level_sequences(size)]
+            if len(prefixes) >= shards:
+                break
+        return prefixes
+    raise ValueError(f"Unknown enumeration kind: {kind}")
+
+
+def iter_shard(kind: str, n: int, shard) -> Generator:
+    """Items of one shard produced by enumeration_shards."""
+    if kind == "partitions":
+        yield from dyck_words(n, start=shard[0], stop=shard[1])
+    elif kind == "trees":
+        for levels in rooted_level_sequences_with_prefix(n, shard):
+            yield tuple(levels)
+    elif kind == "matula":
+        _check_matula_nodes(n)
+        for levels in rooted_level_sequences_with_prefix(n, shard):
+            yield tuple(levels), level_sequence_to_matula(levels)
+    else:
+        raise ValueError(f"Unknown enumeration kind: {kind}")
+
+
+class ShardReducer(ABC):
+    """
+    Reduction run inside each worker and merged in shard order.
+
+    Subclasses must implement update and merge, and must be picklable
+    (defined at module level, with picklable attributes) since they are
+    shipped to worker processes.
+    """
+
+    def start(self):
+        return None
+
+    @abstractmethod
+    def update(self, acc, item):
+        """Fold one item into a shard's accumulator and return it."""
+
+    @abstractmethod
+    def merge(self, left, right):
+        """Combine the accumulators of consecutive shards."""
+
+
+class CountReducer(ShardReducer):
+    """Count the enumerated items."""
+
+    def start(self) -> int:
+        return 0
+
+    def update(self, acc: int, item) -> int:
+        return acc + 1
+
+    def merge(self, left: int, right: int) -> int:
+        return left + right
+
+
+class HistogramReducer(ShardReducer):
+    """Histogram of key(item) over the enumerated items."""
+
+    def __init__(self, key):
+        self.key = key
+
+    def start(self) -> Dict:
+        return {}
+
+    def update(self, acc: Dict, item) -> Dict:
+        k = self.key(item)
+        acc[k] = acc.get(k, 0) + 1
+        return acc
+
+    def merge(self, left: Dict, right: Dict) -> Dict:
+        for k, count in right.items():
+            left[k] = left.get(k, 0) + count
+        return left
+
+
+class FilterReducer(ShardReducer):
+    """Collect the items for which predicate(item) is true, in order."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    def start(self) -> list:
+        return []
+
+    def update(self, acc: list, item) -> list:
+        if self.predicate(item):
+            acc.append(item)
+        return acc
+
+    def merge(self, left: list, right: list) -> list:
+        left.extend(right)
+        return left
+
+
+# Default shards hold at most this many items on average, and parallel_iter
+# passes items from workers to the parent in pickled chunks of this size
+PARALLEL_SHARD_ITEMS = 1 << 16
+PARALLEL_SPOOL_CHUNK = 1 << 12
+
+
+def enumeration_size(kind: str, n: int) -> int:
+    """Number of items an enumeration yields."""
+    if kind == "partitions":
+        return catalan_number(n)
+    if kind in ("trees", "matula"):
+        return _rooted_tree_count(n) if n >= 1 else 0
+    raise ValueError(f"Unknown enumeration kind: {kind}")
+
+
+def _default_shards(kind: str, n: int, processes: int) -> int:
+    return max(8 * processes, -(-enumeration_size(kind, n) // PARALLEL_SHARD_ITEMS))
+
+
+def _run_shard(task):
+    """Worker entry point: enumerate one shard and reduce, write or spool it."""
+    kind, n, shard, index, reducer, output_dir, spool_dir = task
+    items = iter_shard(kind, n, shard)
+    if reducer is not None:
+        acc = reducer.start()
+        for item in items:
+            acc = reducer.update(acc, item)
+        return acc
+    if output_dir is not None:
+        path = os.path.join(output_dir, f"{kind}-{n}-shard-{index:05d}.txt")
+        with open(path, "w") as f:
+            for item in items:
+                f.write(f"{item}\n")
+        return path
+    path = os.path.join(spool_dir, f"shard-{index:05d}.pickle")
+    with open(path, "wb") as f:
+        while True:
+            chunk = list(itertools.islice(items, PARALLEL_SPOOL_CHUNK))
+            if not chunk:
+                break
+            pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+    return path
+
+
+def _shard_tasks(kind, n, shards, reducer=None, output_dir=None, spool_dir=None):
+    return [
+        (kind, n, shard, index, reducer, output_dir, spool_dir)
+        for index, shard in enumerate(enumeration_shards(kind, n, shards))
+    ]
+
+
+def parallel_reduce(kind: str, n: int, reducer: ShardReducer,
+                    processes: Optional[int] = None, shards: Optional[int] = None):
+    """Reduce a whole enumeration across a process pool."""
+    processes = processes or os.cpu_count() or 1
+    tasks = _shard_tasks(kind, n, shards or _default_shards(kind, n, processes),
+                         reducer=reducer)
+    result = reducer.start()
+    with multiprocessing.Pool(processes) as pool:
+        for partial in pool.imap(_run_shard, tasks):
+            result = reducer.merge(result, partial)
     return result
 
 
+def parallel_iter(kind: str, n: int, processes: Optional[int] = None,
+                  shards: Optional[int] = None) -> Generator:
+    """
+    Stream an enumeration computed across a process pool, in serial order.
+
+    Workers spool each shard to a temporary file in pickled chunks of
+    PARALLEL_SPOOL_CHUNK items, and at most 2 * processes shards are queued
+    or unread at a time, so the parent holds a single chunk however uneven
+    the shards are and the disk holds a bounded window of shards.
+    """
+    processes = processes or os.cpu_count() or 1
+    shards = shards or _default_shards(kind, n, processes)
+    with tempfile.TemporaryDirectory(prefix="cosysoc-shards-") as spool_dir, \
+            multiprocessing.Pool(processes) as pool:
+        tasks = iter(_shard_tasks(kind, n, shards, spool_dir=spool_dir))
+        pending = deque(pool.apply_async(_run_shard, (task,))
+                        for task in itertools.islice(tasks, 2 * processes))
+        while pending:
+            path = pending.popleft().get()
+            task = next(tasks, None)
+            if task is not None:
+                pending.append(pool.apply_async(_run_shard, (task,)))
+            with open(path, "rb") as f:
+                while True:
+                    try:
+                        chunk = pickle.load(f)
+                    except EOFError:
+                        break
+                    yield from chunk
+            os.remove(path)
+
+
+def parallel_to_files(kind: str, n: int, output_dir: str,
+                      processes: Optional[int] = None,
+                      shards: Optional[int] = None) -> List[str]:
+    """Write each shard to its own text file; returns the paths in order."""
+    processes = processes or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+    tasks = _shard_tasks(kind, n, shards or _default_shards(kind, n, processes),
+                         output_dir=output_dir)
+    with multiprocessing.Pool(processes) as pool:
+        return list(pool.imap(_run_shard, tasks))
+
+
+# =============================================================================
+# RANDOM SAMPLING - Uniform Dyck words and rooted trees
+# =============================================================================
+
+_SAMPLE_CELLS = 1 << 25    # steps per numpy block in sample_dyck_words
+_SAMPLE_TREE_CELLS = 1 << 22   # nodes per numpy block in sample_tree_levels
+_SAMPLE_TREE_LOOKUP = 14       # subtrees up to this size come from a table
+_GUIDE_BINS = 4                # guide table entries per (j, d) choice
+_RANRUT_CUTOFF = 1e-18     # (j, d) choices below this probability are dropped
+
+
+def _as_random(rng) -> random.Random:
+    """Accept a random.Random, a seed, or None (fresh entropy)."""
+    return rng if isinstance(rng, random.Random) else random.Random(rng)
+
+
+def random_dyck_word(n: int, rng=None, as_int: bool = False):
+    """
+    One uniform Dyck word with n pairs (cycle lemma).
+
+    A shuffled sequence of n '(' and n + 1 ')' has exactly one rotation
+    whose every proper prefix stays non-negative: the one starting just
+    after the first minimum of the running height. Dropping its final ')'
+    leaves a uniformly distributed Dyck word. rng may be a random.Random
+    or a seed.
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    rng = _as_random(rng)
+    steps = [1] * n + [-1] * (n + 1)
+    rng.shuffle(steps)
+    height = low = 0
+    cut = 0
+    for pos, step in enumerate(steps):
+        height += step
+        if height < low:
+            low = height
+            cut = pos + 1
+    steps = steps[cut:] + steps[:cut - 1]
+    word = "".join("(" if step > 0 else ")" for step in steps)
+    return dyck_to_int(word) if as_int else word
+
+
+def sample_dyck_words(n: int, count: int, seed: Optional[int] = None,
+                      chunk: Optional[int] = None) -> Generator:
+    """
+    Stream count uniform Dyck words with n pairs as numpy bool blocks.
+
+    Each block has shape (rows, 2n) with True marking ')', the bit order
+    of dyck_to_int. Whole columns are drawn at once: with r steps left at
+    height h the next step closes with probability
+    1 - (r - h)(h + 2) / (2r(h + 1)), the ratio of completion counts,
+    so every row is a uniform Dyck word and the work is 2n vector
+    operations per block. numpy is only imported here.
+    """
+    import numpy as np
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    rng = np.random.default_rng(seed)
+    width = 2 * n
+    chunk = chunk or max(1, _SAMPLE_CELLS // max(width, 1))
+    done = 0
+    while done < count:
+        rows = min(chunk, count - done)
+        # column-major so that each step writes one contiguous column
+        words = np.empty((width, rows), dtype=bool)
+        height = np.zeros(rows)
+        draw = np.empty(rows)
+        opens = np.empty(rows)
+        scale = np.empty(rows)
+        for pos in range(width):
+            r = width - pos
+            rng.random(out=draw)
+            np.subtract(r, height, out=opens)
+            opens *= height + 2
+            np.add(height, 1, out=scale)
+            scale *= 2 * r
+            draw *= scale
+            np.greater_equal(draw, opens, out=words[pos])
+            height += 1
+            height -= 2 * words[pos]
+        yield words.T
+        done += rows
+
+
+def _rooted_tree_count(n: int) -> int:
+    """A000081 from the bundled tables, else the engine in systems_math."""
+    if TABLES is not None and n <= TABLES.rooted_trees_max:
+        return TABLES.rooted_trees(n)
+    try:
+        from .systems_math import rooted_trees
+    except ImportError:
+        from systems_math import rooted_trees
+    return rooted_trees(n)
+
+
+@lru_cache(maxsize=None)
+def _log_rooted_tree_count(n: int) -> float:
+    return math.log(_rooted_tree_count(n))
+
+
+@lru_cache(maxsize=None)
+def _ranrut_table(m: int) -> Tuple[array, array, array]:
+    """
+    Cumulative distribution of the (j, d) split for trees with m nodes.
+
+    Nijenhuis and Wilf: P(j, d) = d a(d) a(m - jd) / ((m - 1) a(m)) for
+    j, d >= 1, jd <= m - 1. Weights are formed in log space because a(m)
+    leaves the float range near m = 450; negligible choices are dropped,
+    and as a(m - jd) falls with j the rest of that d's row goes with them.
+    """
+    log_total = math.log(m - 1) + _log_rooted_tree_count(m)
+    cumulative, js, ds = array('d'), array('l'), array('l')
+    acc = 0.0
+    for d in range(1, m):
+        log_d = math.log(d) + _log_rooted_tree_count(d) - log_total
+        for j in range(1, (m - 1) // d + 1):
+            p = math.exp(log_d + _log_rooted_tree_count(m - j * d))
+            if p < _RANRUT_CUTOFF:
+                break
+            acc += p
+            cumulative.append(acc)
+            js.append(j)
+            ds.append(d)
+    for i in range(len(cumulative)):
+        cumulative[i] /= acc
+    cumulative[-1] = 1.0    # random() < 1.0, so bisect always lands in range
+    return cumulative, js, ds
+
+
+def _random_tree_levels(n: int, rng: random.Random) -> List[int]:
+    """
+    Preorder level sequence of a uniform rooted tree (RANRUT).
+
+    A tree of m nodes is a tree of m - jd nodes with j copies of one
+    random d-node tree hung from its root. The recursion into d runs on
+    an explicit stack writing straight into one level list; the extra
+    j - 1 copies are a slice of what the d-node subtree just wrote.
+    """
+    levels = [0]
+    # frame: [nodes left to place under this root, depth, copies, start]
+    stack = [[n, 0, 1, 0]]
+    while stack:
+        frame = stack[-1]
+        if frame[0] > 1:
+            cumulative, js, ds = _ranrut_table(frame[0])
+            i = bisect.bisect_right(cumulative, rng.random())
+            frame[0] -= js[i] * ds[i]
+            depth = frame[1] + 1
+            stack.append([ds[i], depth, js[i], len(levels)])
+            levels.append(depth)
+            continue
+        stack.pop()
+        if frame[2] > 1:
+            levels.extend(levels[frame[3]:] * (frame[2] - 1))
+    return levels
+
+
+def random_rooted_tree(n: int, rng=None) -> CompactTree:
+    """
+    One uniform unlabeled rooted tree with n nodes, as a CompactTree.
+
+    Every A000081 shape is equally likely. rng may be a random.Random or
+    a seed.
+    """
+    if n < 1:
+        raise ValueError("n must be >= 1")
+    return CompactTree(_random_tree_levels(n, _as_random(rng)))
+
+
+@lru_cache(maxsize=4)
+def _ranrut_flat(n: int):
+    """
+    Every _ranrut_table(m) for _SAMPLE_TREE_LOOKUP < m <= n in flat numpy form.
+
+    Returns (cumulative, js, ds, offset, size, guide): the table for m is
+    [offset[m], offset[m] + size[m]) of the first three. Its Chen-Asau
+    guide table is the b = _GUIDE_BINS * size[m] entries of guide from
+    _GUIDE_BINS * offset[m], entry i being the first choice whose
+    cumulative exceeds i / b. A draw u starts at entry floor(u * b) and
+    rarely steps forward, landing where bisect_right would.
+    """
+    import numpy as np
+    offset = np.zeros(n + 1, dtype=np.int64)
+    size = np.ones(n + 1, dtype=np.int64)
+    cumulative, js, ds, guide = [], [], [], []
+    at = 0
+    for m in range(_SAMPLE_TREE_LOOKUP + 1, n + 1):
+        c, j, d = _ranrut_table(m)
+        c = np.frombuffer(c)
+        offset[m], size[m] = at, len(c)
+        cumulative.append(c)
+        js.append(np.frombuffer(j, dtype=np.dtype(j.typecode)))
+        ds.append(np.frombuffer(d, dtype=np.dtype(d.typecode)))
+        bins = _GUIDE_BINS * len(c)
+        steps = np.arange(bins) / bins
+        guide.append(np.searchsorted(c, steps, side="right") + at)
+        at += len(c)
+    if not cumulative:
+        empty = np.zeros(0)
+        return empty, empty, empty, offset, size, empty
+    return (np.concatenate(cumulative), np.concatenate(js).astype(np.int64),
+            np.concatenate(ds).astype(np.int64), offset, size,
+            np.concatenate(guide))
+
+
+def _uniform_below(rng, high):
+    """Uniform integers in [0, high) for an array of bounds (floor(u * high))."""
+    return (rng.random(len(high)) * high).astype(high.dtype)
+
+
+@lru_cache(maxsize=None)
+def _small_tree_lookup(k: int):
+    """
+    Level sequences of every rooted tree with at most k nodes, flattened.
+
+    Returns (levels, offset, count): the a(d) trees with d nodes are rows
+    of length d starting at offset[d], count[d] = a(d) of them.
+    """
+    import numpy as np
+    offset = np.zeros(k + 1, dtype=np.int64)
+    count = np.zeros(k + 1, dtype=np.int64)
+    blocks = []
+    at = 0
+    for d in range(1, k + 1):
+        trees = np.array([levels[:] for levels in rooted_level_sequences(d)],
+                         dtype=np.int8)
+        offset[d], count[d] = at, len(trees)
+        blocks.append(trees.ravel())
+        at += trees.size
+    return np.concatenate(blocks), offset, count
+
+
+def sample_tree_levels(n: int, count: int, seed: Optional[int] = None,
+                       chunk: Optional[int] = None) -> Generator:
+    """
+    Stream count uniform rooted trees with n nodes as numpy level blocks.
+
+    Each block has shape (rows, n) and holds one preorder level sequence
+    per row. RANRUT runs on the whole block at once: every open frame
+    draws its (j, d) split together through _ranrut_flat, and the j
+    copies of the d-node subtree it starts are laid out at the frame's
+    cursor, as their size is known before they are filled. Subtrees of
+    at most _SAMPLE_TREE_LOOKUP nodes, and the rest of a frame once that
+    few nodes are left (itself a uniform tree), are a uniform pick from
+    _small_tree_lookup rather than a recursion, which removes most draws;
+    copies of larger subtrees are back references to the previous copy,
+    resolved by pointer jumping at the end of the block. The output is
+    fixed by seed and chunk. numpy is only imported here.
+    """
+    import numpy as np
+    if n < 1:
+        raise ValueError("n must be >= 1")
+    rng = np.random.default_rng(seed)
+    dtype = np.int16 if n <= 1 << 15 else np.int32
+    cumulative, js, ds, table_offset, table_size, guide = _ranrut_flat(n)
+    small = min(n, _SAMPLE_TREE_LOOKUP)
+    lookup, lookup_offset, lookup_count = _small_tree_lookup(small)
+    chunk = chunk or max(1, _SAMPLE_TREE_CELLS // n)
+    index = np.int32 if chunk * n < 1 << 31 else np.int64
+    done = 0
+    while done < count:
+        rows = min(chunk, count - done)
+        cells = rows * n
+        levels = np.zeros(cells, dtype=dtype)
+        # child groups, one column each: j copies of a d-node subtree at
+        # cursor with its root at depth; the roots of the block come first
+        groups = np.zeros((4, rows), dtype=index)
+        groups[0] = np.arange(0, cells, n)
+        groups[1], groups[2] = 1, n
+        # open frames: nodes left to place under a root, its depth, and
+        # where its next child group starts
+        frames = np.zeros((3, 0), dtype=index)
+        # groups and frame remainders (skipping the root) to fill by lookup
+        fills, rests, copies = [], [frames], []
+        while groups.size:
+            looked_up = groups[2] <= small
+            fills.append(np.compress(looked_up, groups, axis=1))
+            cursor, j, d, depth = np.compress(~looked_up, groups, axis=1)
+            levels[cursor] = depth
+            many = j > 1
+            copies.append((cursor[many] + d[many], (j[many] - 1) * d[many], d[many]))
+            frames = np.concatenate((frames, [d, depth, cursor + 1]), axis=1)
+            if not frames.size:
+                break
+            left, depth, cursor = frames
+            u = rng.random(left.size)
+            bins = table_size[left] * _GUIDE_BINS
+            pick = guide[table_offset[left] * _GUIDE_BINS
+                         + np.minimum((u * bins).astype(index), bins - 1)]
+            behind = np.flatnonzero(cumulative[pick] <= u)
+            while behind.size:
+                pick[behind] += 1
+                behind = behind[cumulative[pick[behind]] <= u[behind]]
+            j, d = js[pick], ds[pick]
+            groups = np.stack((cursor, j, d, depth + 1))
+            cursor += j * d
+            left -= j * d
+            rests.append(np.compress((left > 1) & (left <= small), frames, axis=1))
+            frames = np.compress(left > small, frames, axis=1)
+        cursor, j, d, depth = np.concatenate(fills, axis=1)
+        source = lookup_offset[d] + _uniform_below(rng, lookup_count[d]) * d
+        if (j > 1).any():
+            # the j copies of a looked-up subtree repeat the same pick
+            copy = np.arange(j.sum(), dtype=index) - np.repeat(np.cumsum(j) - j, j)
+            cursor = np.repeat(cursor, j) + copy * np.repeat(d, j)
+            d, depth, source = np.repeat(d, j), np.repeat(depth, j), np.repeat(source, j)
+        # the rest of a frame is a lookup tree whose root is already placed
+        left, rest_depth, rest_cursor = np.concatenate(rests, axis=1)
+        cursor = np.concatenate((cursor, rest_cursor))
+        depth = np.concatenate((depth, rest_depth))
+        source = np.concatenate(
+            (source, lookup_offset[left] + 1 + _uniform_below(rng, lookup_count[left]) * left))
+        spans = np.concatenate((d, left - 1)).astype(index)
+        ends = np.cumsum(spans)
+        pos = np.arange(ends[-1] if ends.size else 0, dtype=index)
+        step = np.repeat((source - ends + spans).astype(index), spans)
+        step += pos
+        pos += np.repeat(cursor - ends + spans, spans)
+        levels[pos] = lookup[step] + np.repeat(depth.astype(dtype), spans)
+        start, spans, size = (np.concatenate(part) for part in zip(*copies))
+        if spans.size:
+            source = np.arange(cells, dtype=index)
+            pos = np.arange(spans.sum(), dtype=index)
+            pos += np.repeat(start - np.cumsum(spans) + spans, spans)
+            source[pos] = pos - np.repeat(size, spans)
+            while True:
+                hop = source[source]
+                if np.array_equal(hop, source):
+                    break
+                source = hop
+            levels = levels[source]
+        yield levels.reshape(rows, n)
+        done += rows
+
+
+def sample_rooted_trees(n: int, count: int, seed: Optional[int] = None,
+                        chunk: Optional[int] = None) -> Generator[CompactTree, None, None]:
+    """
+    Stream count independent uniform rooted trees with n nodes.
+
+    A CompactTree per row of sample_tree_levels; use that directly when
+    the trees are consumed as arrays, as building the objects costs more
+    than sampling them.
+    """
+    for block in sample_tree_levels(n, count, seed, chunk):
+        typecode = _level_typecode(int(block.max()))
+        for row in block.tolist():
+            yield CompactTree(array(typecode, row))
+
+
 # =============================================================================
 # NESTED TUPLE EXPRESSIONS
 # =============================================================================
@@ -215,14 +2012,48 @@ class NestedTuple:
         children_str = ",".join(repr(c) for c in self.children)
         return f"[{self.level}[{children_str}]]"
     
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Shape of the expansion: (n, n-1, ..., 1)."""
+        if self.level <= 1:
+            return (1,)
+        return tuple(range(self.level, 0, -1))
+    
+    def view(self) -> 'NestedTupleView':
+        """Lazy, indexable view of the expansion."""
+        return NestedTupleView(self.shape)
+    
+    def to_numpy(self, dtype=int, writeable: bool = False):
+        """Expansion as a NumPy array of ones with shape self.shape."""
+        return self.view().to_numpy(dtype, writeable)
+    
     def expand(self) -> str:
         """Expand to full nested form."""
-        if self.level <= 1:
-            return "[1]"
-        
+        if self.level <= _EXPANSION_MEMO_LEVEL:
+            return _nested_expansion(self.level)
+        out = io.StringIO()
+        self.write_expansion(out.write)
+        return out.getvalue()
+    
+    def write_expansion(self, write) -> None:
+        """
+        Stream the expansion to a write callable (e.g. a file's write).
+
+        Sub-expansions up to _EXPANSION_MEMO_LEVEL are memoized and written
+        as whole chunks, so only the top levels are walked.
+        """
+        level = self.level
+        if level <= _EXPANSION_MEMO_LEVEL:
+            write(_nested_expansion(level))
+            return
         # Create 'level' copies of the previous system
-        prev = NestedTuple(self.level - 1)
-        return f"[{','.join([prev.expand()] * self.level)}]"
+        prev = NestedTuple(level - 1)
+        write("[")
+        for i in range(level):
+            if i:
+                write(",")
+            prev.write_expansion(write)
+        write("]")
     
     def to_array(self) -> list:
         """Convert to nested Python list."""
@@ -233,6 +2064,82 @@ class NestedTuple:
         return [prev.to_array() for _ in range(self.level)]
 
 
+# Expansions are memoized up to this level (about 220 KB of text at level 8)
+_EXPANSION_MEMO_LEVEL = 8
+
+
+@lru_cache(maxsize=None)
+def _nested_expansion(level: int) -> str:
+    """Expanded string of NestedTuple(level), built from the level below."""
+    if level <= 1:
+        return "[1]"
+    return f"[{','.join([_nested_expansion(level - 1)] * level)}]"
+
+
+class NestedTupleView:
+    """
+    Lazy view of a nested tuple expansion with a given shape.
+
+    Every leaf is 1, so the view only needs its shape: indexing, slicing
+    and iteration return sub-views (or leaf values) without materializing
+    any nested lists.
+    """
+
+    __slots__ = ("shape",)
+
+    def __init__(self, shape: Tuple[int, ...]):
+        self.shape = tuple(shape)
+
+    def __repr__(self) -> str:
+        return f"NestedTupleView(shape={self.shape})"
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return math.prod(self.shape)
+
+    def __getitem__(self, key):
+        keys = key if isinstance(key, tuple) else (key,)
+        if len(keys) > len(self.shape):
+            raise IndexError("too many indices")
+        shape = []
+        for k, dim in zip(keys, self.shape):
+            if isinstance(k, slice):
+                shape.append(len(range(*k.indices(dim))))
+            else:
+                if not -dim <= k < dim:
+                    raise IndexError(f"index {k} out of range for axis of length {dim}")
+        shape.extend(self.shape[len(keys):])
+        if not shape:
+            return 1
+        return NestedTupleView(tuple(shape))
+
+    def __iter__(self):
+        for i in range(self.shape[0]):
+            yield self[i]
+
+    def to_numpy(self, dtype=int, writeable: bool = False):
+        """
+        NumPy array of ones with this view's shape.
+
+        By default this is a read-only broadcast of a single scalar, so it
+        costs no memory regardless of size; writeable=True allocates.
+        """
+        import numpy as np
+        if writeable:
+            return np.ones(self.shape, dtype=dtype)
+        return np.broadcast_to(np.ones((), dtype=dtype), self.shape)
+
+    def __array__(self, dtype=None, copy=None):
+        return self.to_numpy(dtype or int, writeable=bool(copy))
+
+
 def system_nested_tuple(n: int) -> NestedTuple:
     """Create the nested tuple expression for System n."""
     return NestedTuple(n)
@@ -259,13 +2166,13 @@ class CosmosSystem:
     concurrency: int
     concurrency_name: str
     
-    # Matula numbers for this system
-    matula_numbers: List[int]
+    # Matula numbers for this system, or None when they were not computed
+    matula_numbers: Optional[List[int]]
     
     # Additional properties
     properties: List[str] = field(default_factory=list)
     
-    @property
+    @cached_property
     def pascal_coefficients(self) -> Tuple[int, ...]:
         """Pascal's triangle row for this system."""
         if self.number < 0:
@@ -273,22 +2180,34 @@ class CosmosSystem:
         return pascal_row(self.number)
     
     @property
+    def pascal_sum(self) -> int:
+        """Sum of the Pascal row (2^n), without building the row."""
+        return 1 << max(self.number, 0)
+    
+    @cached_property
     def simplex_elements(self) -> Dict[str, int]:
         """Element counts for the corresponding simplex."""
         return simplex_elements(self.simplex_dim)
     
-    @property
+    @cached_property
     def nested_tuple(self) -> NestedTuple:
         """Nested tuple expression for this system."""
         return system_nested_tuple(self.number)
     
-    @property
+    @cached_property
     def topological_surfaces(self) -> List[str]:
         """All valid topological surfaces (partitions)."""
         if self.number <= 0:
             return ["{}"]
         return [f"{{{p}}}" for p in generate_partitions(self.number)]
     
+    @property
+    def surface_count(self) -> int:
+        """Number of topological surfaces (Catalan C_n), without enumerating them."""
+        if self.number <= 0:
+            return 1
+        return catalan_number(self.number)
+    
     @property
     def catalan(self) -> int:
         """Catalan number for partition count."""
@@ -312,7 +2231,7 @@ SYSTEM_0 = CosmosSystem(
     simplex_name="vo-id",
     concurrency=-1,
     concurrency_name="0-Sets (Category/Spin)",
-    matula_numbers=[1],
+    matula_numbers=system_matula_numbers(0),
     properties=["Category", "Spin", "Unmarked State"]
 )
 
@@ -327,7 +2246,7 @@ SYSTEM_1 = CosmosSystem(
     simplex_name="mon-ad",
     concurrency=0,
     concurrency_name="1-Nest (Degree/Point)",
-    matula_numbers=[2],
+    matula_numbers=system_matula_numbers(1),
     properties=["Degree", "Point", "Universal Wholeness"]
 )
 
@@ -342,7 +2261,7 @@ SYSTEM_2 = CosmosSystem(
     simplex_name="dia-sect",
     concurrency=1,
     concurrency_name="2-Vert (Metric/Line)",
-    matula_numbers=[4, 3],
+    matula_numbers=system_matula_numbers(2),
     properties=["Metric", "Line", "Perceptive Wholeness"]
 )
 
@@ -357,7 +2276,7 @@ SYSTEM_3 = CosmosSystem(
     simplex_name="tria-gon",
     concurrency=2,
     concurrency_name="3-Edge (Triangle)",
-    matula_numbers=[8, 6, 7, 5],
+    matula_numbers=system_matula_numbers(3),
     properties=["Triangle", "Four Relations", "Discretion-Means-Goal-Consequence"]
 )
 
@@ -372,7 +2291,7 @@ SYSTEM_4 = CosmosSystem(
     simplex_name="tetra-hedron",
     concurrency=3,
     concurrency_name="4-Face (Tetrahedron)",
-    matula_numbers=[16, 12, 9, 14, 10, 19, 13, 17, 11],
+    matula_numbers=system_matula_numbers(4),
     properties=["Tetrahedron", "Enneagram", "Primary Creative Process", "12-Stage Cycle"]
 )
 
@@ -387,19 +2306,178 @@ SYSTEM_5 = CosmosSystem(
     simplex_name="penta-choron",
     concurrency=4,
     concurrency_name="5-Cell (Convolution 2×2)",
-    matula_numbers=[32, 34, 18, 28, 21, 20, 15, 38, 26, 34, 22, 53, 37, 23, 43, 29, 67, 41, 53, 31],
+    matula_numbers=system_matula_numbers(5),
     properties=["Pentachoron", "5-Cell", "3 Concurrent Streams", "[[D-T]-[P-O]-[S-M]]"]
 )
 
 ALL_SYSTEMS = [SYSTEM_0, SYSTEM_1, SYSTEM_2, SYSTEM_3, SYSTEM_4, SYSTEM_5]
 
 
+# =============================================================================
+# GENERATED SYSTEMS - CosmosSystem factory and on-disk catalog
+# =============================================================================
+
+# Hyphenated simplex names for Systems 0-10 (System n is an (n-1)-simplex)
+SIMPLEX_NAMES = [
+    "vo-id", "mon-ad", "dia-sect", "tria-gon", "tetra-hedron", "penta-choron",
+    "hexa-teron", "hepta-peton", "octa-exon", "ennea-zetton", "deca-yotton",
+]
+
+_PARTITION_COUNTS = [1]
+
+
+def partition_count(n: int) -> int:
+    """Number of integer partitions of n (Euler's pentagonal recurrence)."""
+    if n < 0:
+        return 0
+    counts = _PARTITION_COUNTS
+    for m in range(len(counts), n + 1):
+        total = 0
+        k = 1
+        while True:
+            g1 = k * (3 * k - 1) // 2
+            if g1 > m:
+                break
+            sign = 1 if k % 2 else -1
+            total += sign * counts[m - g1]
+            g2 = k * (3 * k + 1) // 2
+            if g2 <= m:
+                total += sign * counts[m - g2]
+            k += 1
+        counts.append(total)
+    return counts[n]
+
+
+def generate_system(n: int, with_matula: Optional[bool] = None) -> CosmosSystem:
+    """
+    Derive the CosmosSystem for System n from its combinatorics.
+
+    - terms: rooted trees with n + 1 nodes (A000081), one Matula number each
+    - partitions: integer partitions of n, split into n - 1 particular and
+      the remainder universal, as in Systems 1-5
+    - simplex and concurrency: the (n-1)-simplex
+    For n <= 5 the derived numbers agree with the hand-written systems.
+
+    Matula numbers are computable up to System MATULA_MAX_NODES - 1
+    (System 11, whose first generation takes a few seconds). Larger
+    systems are generated with matula_numbers=None (not computed) by
+    default; with_matula=True demands them and raises OverflowError past
+    the bound, and with_matula=False skips them for any n.
+    """
+    if n < 0:
+        raise ValueError("n must be >= 0")
+    if with_matula is None:
+        with_matula = n + 1 <= MATULA_MAX_NODES
+    matula_numbers = system_matula_numbers(n) if with_matula else None
+    partitions = partition_count(n) if n else 0
+    particular = max(n - 1, 0)
+    if n < len(SIMPLEX_NAMES):
+        simplex_name = SIMPLEX_NAMES[n]
+        title = simplex_name.replace("-", "").capitalize()
+    else:
+        simplex_name = f"{n - 1}-simplex"
+        title = f"{n - 1}-Simplex"
+    return CosmosSystem(
+        number=n,
+        name=f"{title} (System {n})",
+        terms=_rooted_tree_count(n + 1),
+        partitions=partitions,
+        universal_count=partitions - particular,
+        particular_count=particular,
+        simplex_dim=n - 1,
+        simplex_name=simplex_name,
+        concurrency=n - 1,
+        concurrency_name=f"{n}-Vertex ({title})",
+        matula_numbers=matula_numbers,
+        properties=[title, f"{n}-Vertex Simplex", "Generated"],
+    )
+
+
+class SystemCatalog:
+    """
+    Versioned on-disk cache of generated systems.
+
+    Systems are stored as JSON in ``systems-v<CATALOG_VERSION>.json`` under
+    the cache directory (COSYSOC_CACHE_DIR, or ~/.cache/cosysoc). Bumping
+    CATALOG_VERSION whenever generate_system changes invalidates old files.
+    """
+
+    CATALOG_VERSION = 3
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        if cache_dir is None:
+            cache_dir = os.environ.get(
+                "COSYSOC_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "cosysoc")
+            )
+        self.path = os.path.join(cache_dir, f"systems-v{self.CATALOG_VERSION}.json")
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, dict]] = None
+        self._systems: Dict[int, CosmosSystem] = {}
+
+    def _load(self) -> Dict[str, dict]:
+        if self._entries is None:
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get("version") != self.CATALOG_VERSION:
+                    raise ValueError("catalog version mismatch")
+                self._entries = data["systems"]
+            except (OSError, ValueError, KeyError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"version": self.CATALOG_VERSION, "systems": self._entries}, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, n: int) -> CosmosSystem:
+        """System n, generated on first request and cached in memory and on disk."""
+        with self._lock:
+            system = self._systems.get(n)
+            if system is not None:
+                return system
+            entries = self._load()
+            entry = entries.get(str(n))
+            if entry is not None:
+                system = CosmosSystem(**entry)
+            else:
+                system = generate_system(n)
+                entries[str(n)] = asdict(system)
+                try:
+                    self._save()
+                except OSError:
+                    pass  # An unwritable cache only costs regeneration
+            self._systems[n] = system
+            return system
+
+    def systems(self, max_n: int) -> List[CosmosSystem]:
+        """Systems 0..max_n, using the hand-written definitions up to System 5."""
+        return [get_system(n) if n < len(ALL_SYSTEMS) else self.get(n) for n in range(max_n + 1)]
+
+
+SYSTEM_CATALOG = SystemCatalog()
+
+
+def get_system(n: int) -> CosmosSystem:
+    """System n: hand-written for n <= 5, otherwise from SYSTEM_CATALOG."""
+    if 0 <= n < len(ALL_SYSTEMS):
+        return ALL_SYSTEMS[n]
+    return SYSTEM_CATALOG.get(n)
+
+
 # =============================================================================
 # ANALYSIS FUNCTIONS
 # =============================================================================
 
 def analyze_system(system: CosmosSystem) -> dict:
-    """Generate comprehensive analysis of a system."""
+    """
+    Generate comprehensive analysis of a system.
+
+    Counts come from closed forms, so no partitions are enumerated.
+    """
     return {
         "system": system.number,
         "name": system.name,
@@ -408,7 +2486,7 @@ def analyze_system(system: CosmosSystem) -> dict:
         "universal": system.universal_count,
         "particular": system.particular_count,
         "pascal_row": system.pascal_coefficients,
-        "pascal_sum": sum(system.pascal_coefficients),
+        "pascal_sum": system.pascal_sum,
         "simplex": {
             "dimension": system.simplex_dim,
             "name": system.simplex_name,
@@ -419,9 +2497,10 @@ def analyze_system(system: CosmosSystem) -> dict:
             "name": system.concurrency_name
         },
         "matula_numbers": system.matula_numbers,
+        "matula_computed": system.matula_numbers is not None,
         "nested_tuple": str(system.nested_tuple),
         "catalan_number": system.catalan,
-        "surface_count": len(system.topological_surfaces),
+        "surface_count": system.surface_count,
         "properties": system.properties
     }
 
@@ -452,6 +2531,9 @@ def print_system_summary():
     print("="*80)
     
     for sys in ALL_SYSTEMS:
+        if sys.matula_numbers is None:
+            print(f"System {sys.number}: not computed (past {MATULA_MAX_NODES} nodes)")
+            continue
         matulas = ", ".join(str(m) for m in sys.matula_numbers)
         print(f"System {sys.number}: {{ {matulas} }}")
 
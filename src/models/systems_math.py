@@ -12,10 +12,21 @@ The models capture:
 """
 
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Generator
 from dataclasses import dataclass
 from enum import Enum
+import hashlib
+import itertools
+import json
 import math
+import os
+import struct
+import time
+
+try:
+    from .combinatorics_tables import TABLES
+except ImportError:
+    from combinatorics_tables import TABLES
 
 
 # =============================================================================
@@ -86,6 +97,65 @@ class System2State:
         new_c2 = self.center2 + rate * (self.center1 - self.center2)
         return System2State(new_c1, new_c2)
 
+    def transition_many(self, k: int, rate: float = 0.1) -> 'System2State':
+        """
+        State after k transitions, in closed form.
+
+        Each transition preserves the total and scales the polarity by
+        (1 - 2*rate), so step k needs no intermediate states.
+        """
+        total = self.center1 + self.center2
+        polarity = (1 - 2 * rate) ** k * self.polarity()
+        return System2State((total + polarity) / 2, (total - polarity) / 2)
+
+
+def system2_trajectory(center1, center2, rate=0.1, steps: int = 1,
+                       start: int = 0,
+                       out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Closed-form System 2 trajectories for many initial states and rates.
+
+    center1, center2 and rate broadcast against each other. The result has
+    shape broadcast_shape + (steps, 2) and holds (center1, center2) for
+    transition counts start .. start + steps - 1, where count 0 is the
+    normalized initial state. Pass a preallocated out array and advance
+    start to stream a long trajectory in fixed-size blocks.
+    """
+    c1, c2, r = np.broadcast_arrays(
+        np.asarray(center1, dtype=np.float64),
+        np.asarray(center2, dtype=np.float64),
+        np.asarray(rate, dtype=np.float64),
+    )
+    total = c1 + c2
+    safe_total = np.where(total > 0, total, 1.0)
+    polarity = (c1 - c2) / safe_total
+    total = np.where(total > 0, 1.0, total)
+
+    k = np.arange(start, start + steps)
+    scaled = polarity[..., None] * (1 - 2 * r[..., None]) ** k
+    if out is None:
+        out = np.empty(c1.shape + (steps, 2))
+    np.add(total[..., None], scaled, out=out[..., 0])
+    np.subtract(total[..., None], scaled, out=out[..., 1])
+    out *= 0.5
+    return out
+
+
+def iter_system2_trajectory(center1, center2, rate=0.1, steps: int = 1,
+                            chunk: int = 1024) -> Generator[Tuple[int, np.ndarray], None, None]:
+    """
+    Stream a trajectory of length steps in blocks of at most chunk steps.
+
+    Yields (start, block) pairs; the block buffer is reused between
+    iterations, so copy it if it must outlive the next step.
+    """
+    shape = np.broadcast_shapes(np.shape(center1), np.shape(center2), np.shape(rate))
+    buffer = np.empty(shape + (min(chunk, steps), 2))
+    for start in range(0, steps, chunk):
+        count = min(chunk, steps - start)
+        block = buffer[..., :count, :]
+        yield start, system2_trajectory(center1, center2, rate, count, start, out=block)
+
 
 # =============================================================================
 # SYSTEM 3: Four Relations
@@ -146,6 +216,49 @@ class System3State:
         return universal, particular
 
 
+# Column order of batched relation terms (matches Relation values 1-4)
+RELATION_COLUMNS = (Relation.DISCRETION, Relation.MEANS, Relation.GOAL, Relation.CONSEQUENCE)
+
+RELATION_DTYPE = np.dtype([
+    ('discretion', np.float64),
+    ('means', np.float64),
+    ('goal', np.float64),
+    ('consequence', np.float64),
+])
+
+
+def relation_terms_batch(centers: np.ndarray, structured: bool = False) -> np.ndarray:
+    """
+    Calculate the four relation terms for an (N, 4) batch of centers.
+
+    Rows are normalized to sum to 1 (as System3State does) in one pass.
+    Returns an (N, 4) array with columns ordered as RELATION_COLUMNS, or a
+    structured array of RELATION_DTYPE records when structured=True.
+    """
+    c = np.array(centers, dtype=np.float64, ndmin=2)
+    totals = c.sum(axis=1, keepdims=True)
+    np.divide(c, totals, out=c, where=totals > 0)
+    c0, c1, c2, c3 = c.T
+    terms = np.empty_like(c)
+    terms[:, 0] = c0 * c1 * c2          # Timelike product
+    terms[:, 1] = (c0 + c1) * c2        # Regenerative sum
+    terms[:, 2] = c0 * c3               # Reconciliation
+    terms[:, 3] = c1 * c2 * c3          # Spacelike product
+    if structured:
+        return terms.view(RELATION_DTYPE).reshape(-1)
+    return terms
+
+
+def dyadic_pairs_batch(centers: np.ndarray) -> np.ndarray:
+    """
+    Batched counterpart of System3State.dyadic_pairs.
+
+    Returns an (N, 2, 2) array: [:, 0] is the universal pair
+    (Discretion, Means) and [:, 1] the particular pair (Goal, Consequence).
+    """
+    return relation_terms_batch(centers).reshape(-1, 2, 2)
+
+
 # =============================================================================
 # SYSTEM 4: Primary Creative Process (Enneagram)
 # =============================================================================
@@ -163,6 +276,73 @@ class EnneagramPosition(Enum):
     POS_9 = 9  # Mediating axis
 
 
+# Stages of the 12-step cycle that are expressive (the other 5 are regenerative)
+EXPRESSIVE_STAGES = (0, 1, 2, 4, 5, 8, 9)
+
+
+_STAGE_OPERATOR: Optional[np.ndarray] = None
+
+
+def stage_transformation_matrix() -> np.ndarray:
+    """
+    Shared (read-only) transformation matrix for one System 4 stage.
+
+    The matrix does not depend on the stage, so it is built once and
+    reused by every state and ensemble.
+    """
+    global _STAGE_OPERATOR
+    if _STAGE_OPERATOR is None:
+        # Simplified transformation matrix
+        # Full implementation would follow the exact rules from Fisherman's Guide
+        T = np.eye(9)
+
+        # Six-pointed figure transformations (1→4→2→8→5→7→1)
+        sequence = [0, 3, 1, 7, 4, 6]  # 0-indexed
+        for i in range(len(sequence)):
+            j = (i + 1) % len(sequence)
+            T[sequence[i], sequence[i]] = 0.5
+            T[sequence[j], sequence[i]] = 0.5
+
+        T.setflags(write=False)
+        _STAGE_OPERATOR = T
+    return _STAGE_OPERATOR
+
+
+# Cached repeated squares of the stage operator: entry b holds T^(2^b)
+_STAGE_OPERATOR_SQUARES: List[np.ndarray] = []
+
+
+def _stage_operator_square(bit: int) -> np.ndarray:
+    """Return T^(2^bit), extending the cache of repeated squares as needed"""
+    if not _STAGE_OPERATOR_SQUARES:
+        _STAGE_OPERATOR_SQUARES.append(stage_transformation_matrix())
+    while len(_STAGE_OPERATOR_SQUARES) <= bit:
+        prev = _STAGE_OPERATOR_SQUARES[-1]
+        square = prev @ prev
+        square.setflags(write=False)
+        _STAGE_OPERATOR_SQUARES.append(square)
+    return _STAGE_OPERATOR_SQUARES[bit]
+
+
+def stage_operator_power(k: int) -> np.ndarray:
+    """
+    Operator advancing a System 4 state by k stages (T^k).
+
+    Built by repeated squaring from cached powers, so the cost is
+    O(log k) 9x9 products instead of k.
+    """
+    if k < 0:
+        raise ValueError("k must be >= 0")
+    result = np.eye(9)
+    bit = 0
+    while k:
+        if k & 1:
+            result = _stage_operator_square(bit) @ result
+        k >>= 1
+        bit += 1
+    return result
+
+
 @dataclass
 class System4State:
     """
@@ -206,31 +386,138 @@ class System4State:
         Based on Campbell's transformation rules:
         - Particular sets alternate between positions 8,7,4 and 1,2,5
         - Universal sets flip with the mediating triangle
+
+        Returns a writable copy for callers; advance_stage uses the shared
+        read-only operator directly.
         """
-        # Simplified transformation matrix
-        # Full implementation would follow the exact rules from Fisherman's Guide
-        T = np.eye(9)
-        
-        # Six-pointed figure transformations (1→4→2→8→5→7→1)
-        sequence = [0, 3, 1, 7, 4, 6]  # 0-indexed
-        for i in range(len(sequence)):
-            j = (i + 1) % len(sequence)
-            T[sequence[i], sequence[i]] = 0.5
-            T[sequence[j], sequence[i]] = 0.5
-        
-        return T
+        return stage_transformation_matrix().copy()
     
     def advance_stage(self) -> 'System4State':
         """Advance to the next stage in the 12-stage cycle"""
-        T = self.transformation_matrix()
-        new_positions = T @ self.positions
-        return System4State(list(new_positions), self.stage + 1)
+        new_positions = stage_transformation_matrix() @ self.positions
+        return System4State(new_positions, self.stage + 1)
+
+    def advance_many(self, k: int) -> 'System4State':
+        """Advance k stages at once (equivalent to k calls to advance_stage)"""
+        new_positions = stage_operator_power(k) @ self.positions
+        return System4State(new_positions, self.stage + k)
+
+    def jump_to(self, stage: int) -> 'System4State':
+        """Advance forward to the next occurrence of the given cycle stage"""
+        return self.advance_many((stage - self.stage) % 12)
     
     def expressive_regenerative_mode(self) -> str:
         """Determine if current stage is expressive or regenerative"""
         # 7 expressive, 5 regenerative in 12-step cycle
-        expressive_stages = [0, 1, 2, 4, 5, 8, 9]
-        return "expressive" if self.stage in expressive_stages else "regenerative"
+        return "expressive" if self.stage in EXPRESSIVE_STAGES else "regenerative"
+
+
+class System4Ensemble:
+    """
+    A batch of independent System 4 states evolved together.
+
+    Positions are held as one contiguous (N, 9) float array and the stage
+    counters as an (N,) integer array, so a whole ensemble advances with a
+    single matrix product instead of N dataclass allocations.
+    Results match ``System4State.advance_stage`` member by member.
+    """
+
+    def __init__(self, values: Optional[np.ndarray] = None,
+                 stages: Optional[np.ndarray] = None, size: int = 1):
+        if values is None:
+            values = np.full((size, 9), 1/9)
+        self.positions = np.array(values, dtype=np.float64, order='C', ndmin=2)
+        if self.positions.ndim != 2 or self.positions.shape[1] != 9:
+            raise ValueError("values must have shape (N, 9)")
+        n = self.positions.shape[0]
+        if stages is None:
+            stages = np.zeros(n, dtype=np.int64)
+        self.stages = np.broadcast_to(np.asarray(stages, dtype=np.int64) % 12, (n,)).copy()
+        self._normalize()
+
+    @classmethod
+    def from_states(cls, states: List[System4State]) -> 'System4Ensemble':
+        """Pack a list of scalar states into an ensemble"""
+        values = np.array([s.positions for s in states], dtype=np.float64).reshape(-1, 9)
+        stages = np.array([s.stage for s in states], dtype=np.int64)
+        return cls(values, stages)
+
+    @classmethod
+    def from_arrays(cls, positions: np.ndarray, stages: np.ndarray) -> 'System4Ensemble':
+        """Wrap existing (N, 9) positions and (N,) stages without copying"""
+        ensemble = cls.__new__(cls)
+        ensemble.positions = positions
+        ensemble.stages = stages
+        return ensemble
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The arrays that fully describe this ensemble"""
+        return {'positions': self.positions, 'stages': self.stages}
+
+    def __len__(self) -> int:
+        return self.positions.shape[0]
+
+    def state(self, index: int) -> System4State:
+        """Unpack one member as a scalar System4State"""
+        return System4State(list(self.positions[index]), int(self.stages[index]))
+
+    def to_states(self) -> List[System4State]:
+        """Unpack every member as a scalar System4State"""
+        return [self.state(i) for i in range(len(self))]
+
+    def _normalize(self):
+        """Normalize each member's positions to sum to 1"""
+        totals = self.positions.sum(axis=1, keepdims=True)
+        np.divide(self.positions, totals, out=self.positions, where=totals > 0)
+
+    def advance_stage(self, inplace: bool = False) -> 'System4Ensemble':
+        """Advance every member to the next stage in the 12-stage cycle"""
+        T = stage_transformation_matrix()
+        target = self if inplace else System4Ensemble.__new__(System4Ensemble)
+        target.positions = self.positions @ T.T
+        target.stages = (self.stages + 1) % 12
+        target._normalize()
+        return target
+
+    def advance_many(self, k, inplace: bool = False) -> 'System4Ensemble':
+        """
+        Advance k stages at once.
+
+        k may be a scalar or an (N,) array of per-member step counts. Each
+        member is multiplied only by the cached T^(2^b) factors for the set
+        bits of its own k, so far-future states cost O(log k).
+        """
+        steps = np.broadcast_to(np.asarray(k, dtype=np.int64), (len(self),))
+        if np.any(steps < 0):
+            raise ValueError("k must be >= 0")
+        target = self if inplace else System4Ensemble.__new__(System4Ensemble)
+        positions = self.positions.copy()
+        remaining = steps.copy()
+        bit = 0
+        while np.any(remaining):
+            mask = (remaining & 1).astype(bool)
+            if mask.all():
+                positions = positions @ _stage_operator_square(bit).T
+            elif mask.any():
+                positions[mask] = positions[mask] @ _stage_operator_square(bit).T
+            remaining >>= 1
+            bit += 1
+        target.positions = positions
+        target.stages = (self.stages + steps) % 12
+        target._normalize()
+        return target
+
+    def jump_to(self, stage, inplace: bool = False) -> 'System4Ensemble':
+        """Advance every member forward to the next occurrence of a cycle stage"""
+        return self.advance_many((np.asarray(stage) - self.stages) % 12, inplace=inplace)
+
+    def energy(self) -> np.ndarray:
+        """Total energy of each member"""
+        return self.positions.sum(axis=1)
+
+    def expressive_mask(self) -> np.ndarray:
+        """Boolean mask of members currently in an expressive stage"""
+        return np.isin(self.stages, EXPRESSIVE_STAGES)
 
 
 # =============================================================================
@@ -260,6 +547,35 @@ class TriadicFace:
     edges: Tuple[DyadicEdge, DyadicEdge, DyadicEdge]
 
 
+# Shared tetrahedron topology. Edges are all vertex pairs in lexicographic
+# order; face f is the face opposite (excluding) vertex f.
+TETRAHEDRON_EDGES = ((0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3))
+TETRAHEDRON_FACES = tuple(
+    tuple(v for v in range(4) if v != excluded) for excluded in range(4)
+)
+FACE_EDGE_INDICES = tuple(
+    tuple(e for e, (a, b) in enumerate(TETRAHEDRON_EDGES) if a in face and b in face)
+    for face in TETRAHEDRON_FACES
+)
+
+
+def _incidence(rows: int, cols: int, members) -> np.ndarray:
+    """Build a read-only 0/1 incidence matrix from per-column member lists"""
+    matrix = np.zeros((rows, cols), dtype=np.float64)
+    for col, row_ids in enumerate(members):
+        matrix[list(row_ids), col] = 1.0
+    matrix.setflags(write=False)
+    return matrix
+
+
+VERTEX_EDGE_INCIDENCE = _incidence(4, 6, TETRAHEDRON_EDGES)    # (4, 6)
+VERTEX_FACE_INCIDENCE = _incidence(4, 4, TETRAHEDRON_FACES)    # (4, 4)
+EDGE_FACE_INCIDENCE = _incidence(6, 4, FACE_EDGE_INDICES)      # (6, 4)
+
+SERVICE_POLARITIES = ('D-T', 'P-O', 'S-M')
+SERVICE_KEYS = tuple(f"{polarity}_{i+1}" for polarity in SERVICE_POLARITIES for i in range(6))
+
+
 class System5State:
     """
     System 5: Tetrahedral integration with 18 services.
@@ -278,33 +594,20 @@ class System5State:
         ]
         
         # Initialize 6 edges (all pairs of vertices)
-        self.edges = []
-        for i in range(4):
-            for j in range(i+1, 4):
-                self.edges.append(DyadicEdge(i, j, 1.0/6))
+        self.edges = [DyadicEdge(i, j, 1.0/6) for i, j in TETRAHEDRON_EDGES]
         
         # Initialize 4 faces (each face excludes one vertex)
-        self.faces = []
-        for excluded in range(4):
-            vertex_ids = tuple(i for i in range(4) if i != excluded)
-            face_edges = tuple(
-                e for e in self.edges 
-                if e.vertex1_id in vertex_ids and e.vertex2_id in vertex_ids
-            )
-            self.faces.append(TriadicFace(vertex_ids, face_edges))
+        self.faces = [
+            TriadicFace(vertex_ids, tuple(self.edges[e] for e in edge_ids))
+            for vertex_ids, edge_ids in zip(TETRAHEDRON_FACES, FACE_EDGE_INDICES)
+        ]
         
         # 18 services in [[D-T]-[P-O]-[S-M]] pattern
         self.services = self._init_services()
     
     def _init_services(self) -> Dict[str, float]:
         """Initialize the 18 services"""
-        polarities = ['D-T', 'P-O', 'S-M']
-        services = {}
-        for polarity in polarities:
-            for i in range(6):  # 6 services per polarity
-                key = f"{polarity}_{i+1}"
-                services[key] = 1.0/18
-        return services
+        return {key: 1.0/18 for key in SERVICE_KEYS}  # 6 services per polarity
     
     def phase_angle(self, stream: int) -> float:
         """
@@ -322,16 +625,96 @@ class System5State:
         return (base, base + 4, base + 8)
 
 
+class System5Ensemble:
+    """
+    A batch of System 5 states backed by flat NumPy arrays.
+
+    The tetrahedron topology (edges, faces and their incidence matrices)
+    is shared module-level data; each member only stores its 4 vertex
+    values, 6 edge weights and 18 service values, in row-major arrays of
+    shape (N, 4), (N, 6) and (N, 18). Service columns follow SERVICE_KEYS.
+    """
+
+    def __init__(self, size: int = 1, dtype=np.float64):
+        self.vertex_values = np.full((size, 4), 0.25, dtype=dtype)
+        self.edge_weights = np.full((size, 6), 1.0/6, dtype=dtype)
+        self.services = np.full((size, 18), 1.0/18, dtype=dtype)
+
+    @classmethod
+    def from_arrays(cls, vertex_values: np.ndarray, edge_weights: np.ndarray,
+                    services: Optional[np.ndarray] = None) -> 'System5Ensemble':
+        """Wrap existing per-member arrays without copying where possible"""
+        ensemble = cls.__new__(cls)
+        ensemble.vertex_values = np.asarray(vertex_values).reshape(-1, 4)
+        n = ensemble.vertex_values.shape[0]
+        ensemble.edge_weights = np.asarray(edge_weights).reshape(n, 6)
+        if services is None:
+            services = np.full((n, 18), 1.0/18, dtype=ensemble.vertex_values.dtype)
+        ensemble.services = np.asarray(services).reshape(n, 18)
+        return ensemble
+
+    @classmethod
+    def from_states(cls, states: List[System5State]) -> 'System5Ensemble':
+        """Pack a list of System5State objects into an ensemble"""
+        return cls.from_arrays(
+            [[v.value for v in s.vertices] for s in states],
+            [[e.weight for e in s.edges] for s in states],
+            [[s.services[key] for key in SERVICE_KEYS] for s in states],
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The arrays that fully describe this ensemble"""
+        return {
+            'vertex_values': self.vertex_values,
+            'edge_weights': self.edge_weights,
+            'services': self.services,
+        }
+
+    def __len__(self) -> int:
+        return self.vertex_values.shape[0]
+
+    def state(self, index: int) -> System5State:
+        """Unpack one member as a System5State"""
+        s = System5State()
+        for v, value in zip(s.vertices, self.vertex_values[index]):
+            v.value = float(value)
+        for e, weight in zip(s.edges, self.edge_weights[index]):
+            e.weight = float(weight)
+        s.services = dict(zip(SERVICE_KEYS, map(float, self.services[index])))
+        return s
+
+    def face_values(self) -> np.ndarray:
+        """Sum of vertex values on each face, shape (N, 4)"""
+        return self.vertex_values @ VERTEX_FACE_INCIDENCE
+
+    def face_edge_weights(self) -> np.ndarray:
+        """Sum of edge weights around each face, shape (N, 4)"""
+        return self.edge_weights @ EDGE_FACE_INCIDENCE
+
+    def vertex_edge_weights(self) -> np.ndarray:
+        """Total weight of the edges meeting at each vertex, shape (N, 4)"""
+        return self.edge_weights @ VERTEX_EDGE_INCIDENCE.T
+
+    def edge_vertex_values(self) -> np.ndarray:
+        """Endpoint values of every edge, shape (N, 6, 2)"""
+        return self.vertex_values[:, np.array(TETRAHEDRON_EDGES)]
+
+
 # =============================================================================
 # ENERGY FLOW EQUATIONS
 # =============================================================================
 
-def energy_conservation(state: System4State) -> float:
+def energy_conservation(state) -> float:
     """
     Verify energy conservation in System 4.
     Total energy should remain constant through transformations.
+
+    Also accepts a raw (..., n) array of node potentials, returning the
+    total over the last axis for each batch member.
     """
-    return np.sum(state.positions)
+    if isinstance(state, System4State):
+        return np.sum(state.positions)
+    return np.sum(state, axis=-1)
 
 
 def flow_rate(source: float, sink: float, conductance: float = 1.0) -> float:
@@ -350,21 +733,185 @@ def transformation_energy(before: System4State, after: System4State) -> float:
     return np.sum(np.abs(delta))
 
 
+# Enneagram lines: the six-pointed figure 1-4-2-8-5-7-1, the mediating
+# triangle 3-6-9 and the outer circle 1-2-...-9-1 (all 0-indexed)
+ENNEAGRAM_EDGES = (
+    ((0, 3), (3, 1), (1, 7), (7, 4), (4, 6), (6, 0))
+    + ((2, 5), (5, 8), (8, 2))
+    + tuple((i, (i + 1) % 9) for i in range(9))
+)
+
+
+class FlowNetwork:
+    """
+    Energy flow on a graph of centers driven by potential differences.
+
+    The flow along each edge is flow_rate(source, sink, conductance); the
+    weighted Laplacian L is built once, so a whole (N, n) batch of node
+    potentials is updated with one matrix product per time step.
+    """
+
+    def __init__(self, edges, n_nodes: int, conductance=1.0):
+        self.edges = np.array(edges, dtype=np.intp).reshape(-1, 2)
+        self.n_nodes = n_nodes
+        conductance = np.asarray(conductance, dtype=np.float64)
+        if conductance.shape == (n_nodes, n_nodes):
+            conductance = conductance[self.edges[:, 0], self.edges[:, 1]]
+        self.conductance = np.broadcast_to(conductance, (len(self.edges),)).copy()
+
+        L = np.zeros((n_nodes, n_nodes))
+        i, j = self.edges[:, 0], self.edges[:, 1]
+        np.add.at(L, (i, j), -self.conductance)
+        np.add.at(L, (j, i), -self.conductance)
+        np.add.at(L, (i, i), self.conductance)
+        np.add.at(L, (j, j), self.conductance)
+        L.setflags(write=False)
+        self.laplacian = L
+        self._pinv: Optional[np.ndarray] = None
+
+    @classmethod
+    def system4(cls, conductance=1.0) -> 'FlowNetwork':
+        """Flow network on the nine enneagram positions"""
+        return cls(ENNEAGRAM_EDGES, 9, conductance)
+
+    @classmethod
+    def system5(cls, conductance=1.0) -> 'FlowNetwork':
+        """Flow network on the four tetrahedron vertices"""
+        return cls(TETRAHEDRON_EDGES, 4, conductance)
+
+    @property
+    def max_stable_dt(self) -> float:
+        """Largest explicit time step that keeps step() stable (2 / λmax)"""
+        lam_max = np.linalg.eigvalsh(self.laplacian)[-1]
+        return float('inf') if lam_max <= 0 else 2.0 / lam_max
+
+    def edge_flows(self, potentials: np.ndarray) -> np.ndarray:
+        """Flow along every edge, shape (..., E), positive from first to second node"""
+        p = np.asarray(potentials)
+        return flow_rate(p[..., self.edges[:, 0]], p[..., self.edges[:, 1]], self.conductance)
+
+    def net_outflow(self, potentials: np.ndarray) -> np.ndarray:
+        """Net flow leaving each node, shape (..., n)"""
+        return np.asarray(potentials) @ self.laplacian
+
+    def step(self, potentials: np.ndarray, dt: float = 0.1,
+             injections: Optional[np.ndarray] = None,
+             tolerance: float = 1e-9) -> np.ndarray:
+        """
+        Advance node potentials by one explicit time step.
+
+        Raises ValueError if the network total (energy_conservation) drifts
+        by more than tolerance, relative to the injected energy.
+        """
+        p = np.asarray(potentials, dtype=np.float64)
+        before = energy_conservation(p)
+        new = p - dt * (p @ self.laplacian)
+        if injections is not None:
+            new += dt * np.asarray(injections)
+            before = before + dt * energy_conservation(np.asarray(injections))
+        drift = np.abs(energy_conservation(new) - before)
+        if np.any(drift > tolerance * np.maximum(1.0, np.abs(before))):
+            raise ValueError(f"Energy not conserved: drift {np.max(drift):.3e}")
+        return new
+
+    def evolve(self, potentials: np.ndarray, dt: float = 0.1, steps: int = 1,
+               injections: Optional[np.ndarray] = None,
+               tolerance: float = 1e-9) -> np.ndarray:
+        """Apply step() repeatedly, checking conservation at every step"""
+        p = np.asarray(potentials, dtype=np.float64)
+        for _ in range(steps):
+            p = self.step(p, dt, injections, tolerance)
+        return p
+
+    def steady_state(self, potentials: np.ndarray,
+                     injections: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Steady-state potentials reached from the given batch.
+
+        Without injections each connected component settles at its mean;
+        with zero-sum injections b the result solves L p = b while keeping
+        each component's total energy.
+        """
+        if self._pinv is None:
+            self._pinv = np.linalg.pinv(self.laplacian)
+        # Projector onto the Laplacian's kernel (the per-component means)
+        kernel = np.eye(self.n_nodes) - self._pinv @ self.laplacian
+        p = np.asarray(potentials, dtype=np.float64) @ kernel
+        if injections is not None:
+            p = p + np.asarray(injections) @ self._pinv
+        return p
+
+
 # =============================================================================
 # GEOMETRIC SYMMETRIES
 # =============================================================================
 
+ENNEAGRAM_SEQUENCE = (0, 3, 1, 7, 4, 6, 2, 5, 8)  # 0-indexed, includes mediating
+
+
+def _build_rotation_indices() -> np.ndarray:
+    """Gather indices for all 9 rotation steps: rotated = positions[..., idx[steps]]"""
+    sequence = np.array(ENNEAGRAM_SEQUENCE)
+    indices = np.empty((9, 9), dtype=np.intp)
+    for steps in range(9):
+        indices[steps, np.roll(sequence, -steps)] = sequence
+    indices.setflags(write=False)
+    return indices
+
+
+ENNEAGRAM_ROTATION_INDICES = _build_rotation_indices()
+
+
 def enneagram_rotation(positions: np.ndarray, steps: int = 1) -> np.ndarray:
     """
     Rotate the enneagram by a number of steps.
     The sequence 1→4→2→8→5→7 defines the rotation.
+
+    positions may be a single 9-vector or any (..., 9) batch.
     """
-    sequence = [0, 3, 1, 7, 4, 6, 2, 5, 8]  # 0-indexed, includes mediating
-    new_positions = np.zeros(9)
-    for i, pos in enumerate(sequence):
-        new_idx = (i + steps) % 9
-        new_positions[sequence[new_idx]] = positions[pos]
-    return new_positions
+    return np.asarray(positions, dtype=np.float64)[..., ENNEAGRAM_ROTATION_INDICES[steps % 9]]
+
+
+def compose_rotations(*permutations: np.ndarray) -> np.ndarray:
+    """
+    Compose gather permutations applied in order into a single permutation.
+
+    Accepts rotation step counts or index arrays; applying the result once
+    equals applying each argument in turn.
+    """
+    result = np.arange(9)
+    for perm in permutations:
+        if np.ndim(perm) == 0:
+            perm = ENNEAGRAM_ROTATION_INDICES[int(perm) % 9]
+        result = result[np.asarray(perm)]
+    return result
+
+
+def rotate_positions(positions: np.ndarray, steps=1,
+                     permutation: Optional[np.ndarray] = None,
+                     out: Optional[np.ndarray] = None,
+                     inplace: bool = False) -> np.ndarray:
+    """
+    Apply an enneagram rotation to an (N, 9) batch with fancy indexing.
+
+    steps may be a single count or an (N,) array of per-row counts; a
+    precomposed permutation from compose_rotations takes precedence.
+    With inplace=True the result is written back into positions.
+    """
+    positions = np.asarray(positions)
+    if permutation is not None:
+        rotated = positions[..., np.asarray(permutation)]
+    elif np.ndim(steps) == 0:
+        rotated = positions[..., ENNEAGRAM_ROTATION_INDICES[int(steps) % 9]]
+    else:
+        rows = ENNEAGRAM_ROTATION_INDICES[np.asarray(steps) % 9]
+        rotated = np.take_along_axis(positions, rows, axis=-1)
+    if inplace:
+        out = positions
+    if out is None:
+        return rotated
+    out[...] = rotated
+    return out
 
 
 def tetrahedral_rotation(vertices: List[TetrahedralVertex], axis: int) -> List[TetrahedralVertex]:
@@ -385,10 +932,146 @@ def tetrahedral_rotation(vertices: List[TetrahedralVertex], axis: int) -> List[T
     return new_vertices
 
 
+class TetrahedralGroup:
+    """
+    Precomputed symmetry group of the tetrahedron acting on System 5.
+
+    By default this is the rotation group A4 (12 even vertex permutations);
+    full=True gives S4 (24 elements, including reflections). Element g is
+    stored as a vertex permutation with g[i] the image of vertex i, and
+    element 0 is the identity. The induced permutations of the 6 edges
+    (TETRAHEDRON_EDGES order) and 4 faces (face f is opposite vertex f) are
+    precomputed too, so applying elements to batches is pure fancy indexing.
+    """
+
+    def __init__(self, full: bool = False):
+        perms = [
+            g for g in itertools.permutations(range(4))
+            if full or self._is_even(g)
+        ]
+        self.full = full
+        self.vertex_perms = np.array(perms, dtype=np.intp)
+        self._index = {g: k for k, g in enumerate(perms)}
+
+        edge_index = {edge: k for k, edge in enumerate(TETRAHEDRON_EDGES)}
+        self.edge_perms = np.array([
+            [edge_index[tuple(sorted((g[a], g[b])))] for a, b in TETRAHEDRON_EDGES]
+            for g in perms
+        ], dtype=np.intp)
+        # A face is named by its opposite vertex, so it moves like that vertex
+        self.face_perms = self.vertex_perms
+
+        # table[a, b] is the element a∘b (apply b first, then a)
+        composed = self.vertex_perms[:, self.vertex_perms]  # [a, b, i] = a[b[i]]
+        self.table = np.array([
+            [self._index[tuple(composed[a, b])] for b in range(len(perms))]
+            for a in range(len(perms))
+        ], dtype=np.intp)
+        self.inverse = np.argmax(self.table == 0, axis=1)
+
+        for arr in (self.vertex_perms, self.edge_perms, self.table, self.inverse):
+            arr.setflags(write=False)
+
+    @staticmethod
+    def _is_even(perm: Tuple[int, ...]) -> bool:
+        inversions = sum(
+            1 for i in range(len(perm)) for j in range(i + 1, len(perm)) if perm[i] > perm[j]
+        )
+        return inversions % 2 == 0
+
+    def __len__(self) -> int:
+        return len(self.vertex_perms)
+
+    def element(self, perm: Tuple[int, int, int, int]) -> int:
+        """Index of the element with the given vertex permutation"""
+        return self._index[tuple(perm)]
+
+    def compose(self, a, b):
+        """Element a∘b (b applied first); works elementwise on index arrays"""
+        return self.table[a, b]
+
+    def _perms(self, kind: str) -> np.ndarray:
+        if kind == 'vertex':
+            return self.vertex_perms
+        if kind == 'edge':
+            return self.edge_perms
+        if kind == 'face':
+            return self.face_perms
+        raise ValueError(f"Unknown kind: {kind}")
+
+    def orbit(self, index: int, kind: str = 'vertex') -> List[int]:
+        """Sorted orbit of a vertex, edge or face under the group"""
+        return sorted(set(self._perms(kind)[:, index].tolist()))
+
+    def stabilizer(self, index: int, kind: str = 'vertex') -> List[int]:
+        """Elements fixing a vertex, edge or face"""
+        return np.flatnonzero(self._perms(kind)[:, index] == index).tolist()
+
+    def apply(self, values: np.ndarray, element, kind: str = 'vertex') -> np.ndarray:
+        """
+        Apply group elements to an (..., k) array of vertex, edge or face values.
+
+        The value at position i moves to position g(i). element may be a
+        single index or an array of per-row indices broadcast against
+        values' leading dimensions.
+        """
+        values = np.asarray(values)
+        # Gathering through the inverse moves each value to its image
+        gather = self._perms(kind)[self.inverse[element]]
+        if gather.ndim == 1:
+            return values[..., gather]
+        gather = np.broadcast_to(gather, values.shape[:-1] + gather.shape[-1:])
+        return np.take_along_axis(values, gather, axis=-1)
+
+    def apply_vertices(self, values: np.ndarray, element) -> np.ndarray:
+        """Apply elements to (..., 4) vertex values"""
+        return self.apply(values, element, 'vertex')
+
+    def apply_edges(self, values: np.ndarray, element) -> np.ndarray:
+        """Apply elements to (..., 6) edge values"""
+        return self.apply(values, element, 'edge')
+
+    def apply_faces(self, values: np.ndarray, element) -> np.ndarray:
+        """Apply elements to (..., 4) face values"""
+        return self.apply(values, element, 'face')
+
+
+TETRAHEDRAL_ROTATIONS = TetrahedralGroup()
+
+
 # =============================================================================
 # OEIS A000081 RELATIONSHIP
 # =============================================================================
 
+# Memoized A000081 values (index 0 unused) and the divisor sums
+# s(k) = sum_{d | k} d * a(d) that drive the Euler transform.
+_A000081 = [0, 1]
+_A000081_DIVISOR_SUMS = [0, 1]
+_A000081_CHECK = (1, 1, 2, 4, 9, 20, 48, 115, 286)
+
+
+def _extend_rooted_trees(n: int) -> None:
+    """Extend the memoized A000081 table through index n"""
+    a = _A000081
+    s = _A000081_DIVISOR_SUMS
+    while len(a) <= n:
+        m = len(a) - 1
+        # a(m+1) = (1/m) * sum_{k=1..m} s(k) * a(m-k+1)
+        total = sum(s[k] * a[m - k + 1] for k in range(1, m + 1))
+        a.append(total // m)
+        # s(m+1) needs a(m+1), which is now available
+        k = m + 1
+        d_sum = 0
+        d = 1
+        while d * d <= k:
+            if k % d == 0:
+                d_sum += d * a[d]
+                if d * d != k:
+                    d_sum += (k // d) * a[k // d]
+            d += 1
+        s.append(d_sum)
+
+
 def rooted_trees(n: int) -> int:
     """
     Calculate the number of rooted trees with n nodes.
@@ -399,30 +1082,245 @@ def rooted_trees(n: int) -> int:
     - 2 nests → 2 terms
     - 3 nests → 4 terms
     - 4 nests → 9 terms
+
+    Values are exact and memoized; extending the table to n costs O(n^2)
+    big-integer products via the Euler transform. Values within the
+    bundled combinatorics tables are read from them instead.
     """
     if n <= 0:
         return 0
-    if n == 1:
-        return 1
-    
-    # A000081 values for small n
-    a000081 = [0, 1, 1, 2, 4, 9, 20, 48, 115, 286]
-    if n < len(a000081):
-        return a000081[n]
-    
-    # For larger n, would need recursive calculation
-    return -1  # Not implemented for large n
+    if n >= len(_A000081):
+        if TABLES is not None and n <= TABLES.rooted_trees_max:
+            return TABLES.rooted_trees(n)
+        _extend_rooted_trees(n)
+    return _A000081[n]
+
+
+def iter_rooted_trees(start: int = 1) -> Generator[int, None, None]:
+    """Stream A000081 values a(start), a(start + 1), ... indefinitely"""
+    n = max(start, 1)
+    while True:
+        yield rooted_trees(n)
+        n += 1
+
+
+def save_rooted_trees_table(path: str, n: int) -> None:
+    """
+    Persist A000081 values a(1)..a(n) as one decimal integer per line,
+    after a "# sha256 <hex>" header line covering the value lines
+    """
+    _extend_rooted_trees(n)
+    body = "".join(f"{v}\n" for v in _A000081[1:n + 1])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(f"# sha256 {hashlib.sha256(body.encode()).hexdigest()}\n")
+        f.write(body)
+    os.replace(tmp_path, path)
+
+
+def load_rooted_trees_table(path: str) -> int:
+    """
+    Seed the A000081 memo from a table written by save_rooted_trees_table.
+
+    Returns the number of values available afterwards. The table is only
+    accepted if its SHA-256 header matches and its leading values agree
+    with the known sequence.
+    """
+    with open(path) as f:
+        header = f.readline().split()
+        body = f.read()
+    if (len(header) != 3 or header[:2] != ["#", "sha256"]
+            or hashlib.sha256(body.encode()).hexdigest() != header[2]):
+        raise ValueError(f"{path} is not a valid A000081 table (checksum mismatch)")
+    values = [int(line) for line in body.splitlines() if line.strip()]
+    if tuple(values[:len(_A000081_CHECK)]) != _A000081_CHECK[:len(values)]:
+        raise ValueError(f"{path} is not a valid A000081 table")
+    if len(values) >= len(_A000081):
+        sums = [0] * (len(values) + 1)
+        for d in range(1, len(values) + 1):
+            term = d * values[d - 1]
+            for k in range(d, len(values) + 1, d):
+                sums[k] += term
+        _A000081[1:] = values
+        _A000081_DIVISOR_SUMS[:] = sums
+    return len(_A000081) - 1
 
 
 def nesting_to_terms(nesting_level: int) -> int:
     """
     Map nesting level to number of terms.
     Based on the user's abstract model relating to A000081.
+
+    Levels past 5 follow A000081 directly: a(level + 1).
     """
     mapping = {1: 1, 2: 2, 3: 4, 4: 9, 5: 18}
+    if nesting_level > 5:
+        return rooted_trees(nesting_level + 1)
     return mapping.get(nesting_level, -1)
 
 
+# =============================================================================
+# CHECKPOINTING
+# =============================================================================
+
+# File layout: magic, format version, header length, JSON header, then
+# each array's raw C-order bytes starting on a 64-byte boundary.
+CHECKPOINT_MAGIC = b"COSYCKPT"
+CHECKPOINT_VERSION = 1
+_CHECKPOINT_PREFIX = struct.Struct("<8sII")
+_CHECKPOINT_ALIGN = 64
+
+_CHECKPOINT_KINDS = {
+    'System4Ensemble': System4Ensemble,
+    'System5Ensemble': System5Ensemble,
+}
+
+
+def write_checkpoint(path: str, arrays: Dict[str, np.ndarray], step: int = 0,
+                     metadata: Optional[dict] = None) -> None:
+    """
+    Atomically write named arrays and a step counter to path.
+
+    The file is written beside path, flushed to disk and then renamed over
+    it, so a crash mid-write always leaves the previous checkpoint intact.
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+    entries = []
+    offset = 0
+    for name, a in arrays.items():
+        entries.append({
+            'name': name,
+            'dtype': a.dtype.str,
+            'shape': list(a.shape),
+            'offset': offset,
+        })
+        offset += -(-a.nbytes // _CHECKPOINT_ALIGN) * _CHECKPOINT_ALIGN
+    header = json.dumps({
+        'step': int(step),
+        'metadata': metadata or {},
+        'arrays': entries,
+    }).encode()
+    data_start = _CHECKPOINT_PREFIX.size + len(header)
+    data_start = -(-data_start // _CHECKPOINT_ALIGN) * _CHECKPOINT_ALIGN
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_CHECKPOINT_PREFIX.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, len(header)))
+        f.write(header)
+        for entry, a in zip(entries, arrays.values()):
+            f.seek(data_start + entry['offset'])
+            f.write(a.data)
+        f.truncate(data_start + offset)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path: str, mmap: bool = True) -> Tuple[Dict[str, np.ndarray], int, dict]:
+    """
+    Read a checkpoint written by write_checkpoint.
+
+    Returns (arrays, step, metadata). With mmap=True arrays are
+    copy-on-write memory maps: nothing is read until it is touched, and
+    in-place updates never modify the file.
+    """
+    with open(path, "rb") as f:
+        magic, version, header_len = _CHECKPOINT_PREFIX.unpack(f.read(_CHECKPOINT_PREFIX.size))
+        if magic != CHECKPOINT_MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        if version != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version {version}")
+        header = json.loads(f.read(header_len))
+    data_start = _CHECKPOINT_PREFIX.size + header_len
+    data_start = -(-data_start // _CHECKPOINT_ALIGN) * _CHECKPOINT_ALIGN
+
+    arrays = {}
+    for entry in header['arrays']:
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        offset = data_start + entry['offset']
+        if mmap and dtype.itemsize * math.prod(shape) > 0:
+            arrays[entry['name']] = np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=shape)
+        else:
+            count = math.prod(shape)
+            arrays[entry['name']] = np.fromfile(path, dtype=dtype, count=count, offset=offset).reshape(shape)
+    return arrays, header['step'], header['metadata']
+
+
+class Checkpointer:
+    """
+    Periodic checkpointing for long-running state simulations.
+
+    Batches are System4Ensemble / System5Ensemble objects or raw arrays
+    (e.g. (N, 2) System 2 centers or (N, 4) System 3 centers). Call
+    maybe_save() from the step loop; it only writes when every_steps steps
+    or every_seconds seconds have passed since the last checkpoint.
+    """
+
+    def __init__(self, path: str, every_steps: Optional[int] = 100,
+                 every_seconds: Optional[float] = None):
+        self.path = path
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self._last_step: Optional[int] = None
+        self._last_time = time.monotonic()
+
+    def due(self, step: int) -> bool:
+        """Whether a checkpoint should be written at this step"""
+        if self._last_step is None:
+            return True
+        if self.every_steps is not None and step - self._last_step >= self.every_steps:
+            return True
+        if self.every_seconds is not None and time.monotonic() - self._last_time >= self.every_seconds:
+            return True
+        return False
+
+    def maybe_save(self, step: int, **batches) -> bool:
+        """Save if a checkpoint is due; returns True if one was written"""
+        if not self.due(step):
+            return False
+        self.save(step, **batches)
+        return True
+
+    def save(self, step: int, **batches) -> None:
+        """Write all batches and the step counter unconditionally"""
+        arrays = {}
+        kinds = {}
+        for name, batch in batches.items():
+            if isinstance(batch, np.ndarray):
+                kinds[name] = 'array'
+                arrays[name] = batch
+            else:
+                kinds[name] = type(batch).__name__
+                for field_name, a in batch.to_arrays().items():
+                    arrays[f"{name}/{field_name}"] = a
+        write_checkpoint(self.path, arrays, step, {'kinds': kinds})
+        self._last_step = step
+        self._last_time = time.monotonic()
+
+    def restore(self, mmap: bool = True) -> Tuple[int, Dict[str, object]]:
+        """
+        Load the latest checkpoint as (step, batches).
+
+        Returns (0, {}) when no checkpoint exists yet, so a run can always
+        start with restore().
+        """
+        if not os.path.exists(self.path):
+            return 0, {}
+        arrays, step, metadata = read_checkpoint(self.path, mmap)
+        batches = {}
+        for name, kind in metadata['kinds'].items():
+            if kind == 'array':
+                batches[name] = arrays[name]
+            else:
+                prefix = f"{name}/"
+                fields = {k[len(prefix):]: a for k, a in arrays.items() if k.startswith(prefix)}
+                batches[name] = _CHECKPOINT_KINDS[kind].from_arrays(**fields)
+        self._last_step = step
+        self._last_time = time.monotonic()
+        return step, batches
+
+
 # =============================================================================
 # DEMONSTRATION
 # =============================================================================
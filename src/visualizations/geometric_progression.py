@@ -367,10 +367,10 @@ def create_matula_tree_diagram():
         {'sys': 1, 'nums': [2], 'trees': ['●'], 'color': COLORS['monad']},
         {'sys': 2, 'nums': [4, 3], 'trees': ['● ●', '●─●'], 'color': COLORS['diasect']},
         {'sys': 3, 'nums': [8, 6, 7, 5], 'trees': ['● ● ●', '●─● ●', '●<●', '●─●─●'], 'color': COLORS['triagon']},
-        {'sys': 4, 'nums': [16, 12, 9, 14, 10, 19, 13, 17, 11], 
-         'trees': ['4 sep', '2+nest', '2 pairs', 'bin+1', 'lin+1', 'star', 'mix', 'deep-b', 'deep-l'],
+        {'sys': 4, 'nums': [16, 12, 9, 14, 19, 10, 13, 17, 11], 
+         'trees': ['4 sep', '2+nest', '2 pairs', 'bin+1', 'star', 'lin+1', 'mix', 'deep-b', 'deep-l'],
          'color': COLORS['tetrahedron']},
-        {'sys': 5, 'nums': [32, 34, 18, '...'], 'trees': ['5 sep', 'complex', '...', '20 total'],
+        {'sys': 5, 'nums': [32, 24, 18, '...'], 'trees': ['5 sep', '3+nest', '...', '20 total'],
          'color': COLORS['pentachoron']}
     ]
     